@@ -0,0 +1,28 @@
+# backend/bench/bin/fake_ffmpeg.py
+# Stand-in for `ffmpeg -y -i in.mp3 -ac 1 -ar 16000 out.wav`: writes a silent 16 kHz mono wav as long
+# as the (fake) mp3, after a configurable delay. Called through the wrapper run_bench.py generates.
+
+import os
+import sys
+import json
+import time
+import wave
+
+started = time.perf_counter()
+args = sys.argv[1:]
+src = args[args.index("-i") + 1]
+dst = args[-1]
+
+duration = max(0.1, (os.path.getsize(src) - 3) / 16000)  # fake mp3s are 128 kbps
+time.sleep(float(os.getenv("BENCH_FFMPEG_MS", "120")) / 1000)
+
+with wave.open(dst, "wb") as w:
+    w.setnchannels(1)
+    w.setsampwidth(2)
+    w.setframerate(16000)
+    w.writeframes(b"\x00\x00" * int(duration * 16000))
+
+log = os.getenv("BENCH_STAGE_LOG")
+if log:
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"stage": "ffmpeg", "ms": round((time.perf_counter() - started) * 1000, 2)}) + "\n")
@@ -0,0 +1,36 @@
+# backend/bench/bin/fake_rhubarb.py
+# Stand-in for `rhubarb -f json -o out.json in.wav`. Real rhubarb is CPU-bound and scales with audio
+# length, so the delay is per second of audio (BENCH_RHUBARB_MS_PER_SEC). Writes plausible mouth cues.
+
+import sys
+import json
+import time
+import wave
+import os
+
+started = time.perf_counter()
+args = sys.argv[1:]
+out = args[args.index("-o") + 1]
+src = args[-1]
+
+with wave.open(src, "rb") as w:
+    duration = w.getnframes() / float(w.getframerate())
+
+# Busy-wait instead of sleep: rhubarb competes for CPU with everything else on the kiosk
+deadline = time.perf_counter() + duration * float(os.getenv("BENCH_RHUBARB_MS_PER_SEC", "250")) / 1000
+while time.perf_counter() < deadline: pass
+
+shapes = "XBCDEFAGH"
+cues = []
+t = 0.0
+while t < duration:
+    cues.append({"start": round(t, 2), "end": round(min(duration, t + 0.12), 2), "value": shapes[len(cues) % len(shapes)]})
+    t += 0.12
+
+with open(out, "w", encoding="utf-8") as f:
+    json.dump({"metadata": {"soundFile": src, "duration": round(duration, 2)}, "mouthCues": cues}, f)
+
+log = os.getenv("BENCH_STAGE_LOG")
+if log:
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"stage": "rhubarb", "ms": round((time.perf_counter() - started) * 1000, 2)}) + "\n")
@@ -0,0 +1,238 @@
+# backend/bench/fake_servers.py
+# Local stand-ins for Ollama (/api/generate) and the rgpv.ac.in pages the scraper reads, with
+# configurable latency. Every request is recorded; GET /_bench/stats returns the numbers.
+#
+#   python bench/fake_servers.py --ollama-port 9101 --rgpv-port 9102 --ollama-token-ms 20
+
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+
+NOTICE_COUNT = 40
+TOPICS = ["exam", "result", "scholarship", "admission", "fee", "holiday", "timetable", "revaluation"]
+FILLER = ("Candidates are informed that the schedule mentioned below is final and must be followed by all "
+          "affiliated institutes. Any change will be communicated through the official website only. ")
+
+
+class Recorder:
+    """Per-endpoint latencies served by the stand-ins (thread-safe; both apps share one)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.active = {}
+        self.peak = {}
+
+    def start(self, name):
+        with self.lock:
+            self.active[name] = self.active.get(name, 0) + 1
+            self.peak[name] = max(self.peak.get(name, 0), self.active[name])
+        return time.perf_counter()
+
+    def stop(self, name, started):
+        with self.lock:
+            self.active[name] -= 1
+            self.samples.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+    def snapshot(self, reset=False):
+        with self.lock:
+            out = {name: {"count": len(v), "total_ms": round(sum(v), 1), "peak_concurrency": self.peak.get(name, 0),
+                          "samples_ms": [round(x, 2) for x in v]} for name, v in self.samples.items()}
+            if reset: self.samples, self.peak = {}, {}
+            return out
+
+
+recorder = Recorder()
+
+
+def jittered(ms, jitter):
+    return max(0.0, ms * (1 + random.uniform(-jitter, jitter))) / 1000
+
+
+# ==========================================
+# 1. OLLAMA
+# ==========================================
+
+def build_ollama_app(cfg):
+    app = FastAPI()
+    # Ollama handles OLLAMA_NUM_PARALLEL requests at a time (1 by default); the rest wait in line
+    slots = asyncio.Semaphore(cfg.ollama_parallel)
+
+    def reply_tokens(prompt):
+        words = ["The", "University", "provides", "this", "information", "for", "students", "and", "visitors."]
+        return [words[i % len(words)] + " " for i in range(cfg.ollama_reply_tokens)]
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        prompt = body.get("prompt", "")
+        prompt_tokens = len(prompt.split()) * 4 // 3
+        tokens = reply_tokens(prompt)
+        started = recorder.start("ollama_generate")
+
+        async def produce():
+            async with slots:
+                await asyncio.sleep(jittered(cfg.ollama_load_ms + prompt_tokens * cfg.ollama_prefill_ms, cfg.jitter))
+                for token in tokens:
+                    await asyncio.sleep(jittered(cfg.ollama_token_ms, cfg.jitter))
+                    yield token
+
+        if body.get("stream"):
+            async def lines():
+                try:
+                    async for token in produce():
+                        yield json.dumps({"response": token, "done": False}) + "\n"
+                    yield json.dumps({"response": "", "done": True, "prompt_eval_count": prompt_tokens,
+                                      "eval_count": len(tokens)}) + "\n"
+                finally:
+                    recorder.stop("ollama_generate", started)
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        try:
+            text = "".join([t async for t in produce()])
+        finally:
+            recorder.stop("ollama_generate", started)
+        return {"response": text, "done": True, "prompt_eval_count": prompt_tokens, "eval_count": len(tokens)}
+
+    @app.get("/_bench/stats")
+    def stats(reset: bool = False):
+        return recorder.snapshot(reset)
+
+    return app
+
+
+# ==========================================
+# 2. RGPV WEBSITE
+# ==========================================
+
+def make_pdf(lines):
+    """Smallest valid PDF with one page of Helvetica text (enough for pypdf to extract)."""
+    text_ops = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(
+        "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(text_ops)} >>\nstream\n{text_ops}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+def build_rgpv_app(cfg):
+    app = FastAPI()
+    notices = [(f"{(i % 28) + 1:02d}/0{(i % 9) + 1}/2025", f"Notice regarding {TOPICS[i % len(TOPICS)]} for session 2025 part {i}",
+                f"/Uni/Notices/notice_{i}.pdf") for i in range(NOTICE_COUNT)]
+    pdfs = {}
+    for date, title, path in notices:
+        body = [title, f"Dated {date}"] + [FILLER[:90]] * cfg.pdf_lines
+        pdfs[path] = make_pdf(body)
+
+    async def delay(name):
+        started = recorder.start(name)
+        await asyncio.sleep(jittered(cfg.rgpv_latency_ms, cfg.jitter))
+        return started
+
+    def page(body):
+        return (f"<html><head><title>RGPV</title></head><body><nav><a href='/'>Home</a></nav>"
+                f"<div id='ctl00_ContentPlaceHolder1_pnlContents'>{body}</div><footer>Copyright RGPV</footer></body></html>")
+
+    @app.get("/")
+    async def home():
+        started = await delay("rgpv_home")
+        links = "".join(f"<a href='{path}'>{title}</a><br>" for _, title, path in notices[:10])
+        response = HTMLResponse(page(links))
+        response.set_cookie("ASP.NET_SessionId", "bench", max_age=3600)
+        recorder.stop("rgpv_home", started)
+        return response
+
+    @app.get("/Uni/ImpNoticeArchive.aspx")
+    async def archive():
+        started = await delay("rgpv_archive")
+        rows = "".join(f"<tr><td>{date}</td><td><a href='{path}'>{title}</a></td></tr>" for date, title, path in notices)
+        response = HTMLResponse(page(f"<table>{rows}</table>"))
+        recorder.stop("rgpv_archive", started)
+        return response
+
+    @app.get("/AboutRGTU/{name}.aspx")
+    async def profile(name: str):
+        started = await delay("rgpv_profile")
+        body = f"<h2>{name}</h2><p>Prof. Bench Example, {name} of the University.</p><p>Phone: 0755-2678800</p>"
+        body += "".join(f"<p>{FILLER}</p>" for _ in range(cfg.profile_paragraphs))
+        recorder.stop("rgpv_profile", started)
+        return HTMLResponse(page(body))
+
+    @app.get("/Uni/Notices/{name}")
+    async def notice_pdf(name: str, request: Request):
+        started = await delay("rgpv_pdf")
+        data = pdfs.get(f"/Uni/Notices/{name}")
+        if data is None:
+            recorder.stop("rgpv_pdf", started)
+            return Response(status_code=404)
+        etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+        # Conditional GETs are what keep the PDF cache cheap in production, so honour them here too
+        if request.headers.get("if-none-match") == etag:
+            recorder.stop("rgpv_pdf", started)
+            return Response(status_code=304, headers={"ETag": etag})
+        recorder.stop("rgpv_pdf", started)
+        return Response(data, media_type="application/pdf", headers={"ETag": etag})
+
+    @app.get("/_bench/stats")
+    def stats(reset: bool = False):
+        return recorder.snapshot(reset)
+
+    return app
+
+
+# ==========================================
+# 3. RUNNER
+# ==========================================
+
+def add_arguments(parser):
+    parser.add_argument("--ollama-port", type=int, default=9101)
+    parser.add_argument("--rgpv-port", type=int, default=9102)
+    parser.add_argument("--ollama-parallel", type=int, default=1, help="like OLLAMA_NUM_PARALLEL")
+    parser.add_argument("--ollama-load-ms", type=float, default=50, help="fixed cost per generate call")
+    parser.add_argument("--ollama-prefill-ms", type=float, default=1.0, help="per prompt token")
+    parser.add_argument("--ollama-token-ms", type=float, default=25, help="per generated token")
+    parser.add_argument("--ollama-reply-tokens", type=int, default=60)
+    parser.add_argument("--rgpv-latency-ms", type=float, default=300)
+    parser.add_argument("--pdf-lines", type=int, default=40)
+    parser.add_argument("--profile-paragraphs", type=int, default=20)
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- fraction applied to every delay")
+    return parser
+
+
+def serve(cfg):
+    """Runs both stand-ins in this process until interrupted."""
+    async def main():
+        servers = [
+            uvicorn.Server(uvicorn.Config(build_ollama_app(cfg), port=cfg.ollama_port, log_level="warning")),
+            uvicorn.Server(uvicorn.Config(build_rgpv_app(cfg), port=cfg.rgpv_port, log_level="warning")),
+        ]
+        await asyncio.gather(*(s.serve() for s in servers))
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    cfg = add_arguments(argparse.ArgumentParser(description="Fake Ollama + rgpv.ac.in for benchmarks")).parse_args()
+    print(f"🧪 Fake Ollama on :{cfg.ollama_port}, fake rgpv.ac.in on :{cfg.rgpv_port}")
+    serve(cfg)
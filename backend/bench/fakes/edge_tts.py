@@ -0,0 +1,36 @@
+# backend/bench/fakes/edge_tts.py
+# Stand-in for the edge-tts package (put bench/fakes first on PYTHONPATH). No network: sleeps like the
+# Microsoft endpoint would, then writes a dummy "mp3" sized like a real 128 kbps clip.
+
+import os
+import json
+import time
+import random
+import asyncio
+
+LATENCY_MS = float(os.getenv("BENCH_EDGE_TTS_MS", "250"))      # connect + first byte
+MS_PER_WORD = float(os.getenv("BENCH_EDGE_TTS_MS_PER_WORD", "8"))
+SECONDS_PER_WORD = 0.4  # speaking rate of the generated clip
+BYTES_PER_SECOND = 16000  # 128 kbps
+
+
+def record(stage, started):
+    path = os.getenv("BENCH_STAGE_LOG")
+    if not path: return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"stage": stage, "ms": round((time.perf_counter() - started) * 1000, 2)}) + "\n")
+
+
+class Communicate:
+    def __init__(self, text, voice=None, **kwargs):
+        self.text = text
+        self.voice = voice
+
+    async def save(self, audio_fname, metadata_fname=None):
+        started = time.perf_counter()
+        words = max(1, len(self.text.split()))
+        await asyncio.sleep((LATENCY_MS + words * MS_PER_WORD) * random.uniform(0.8, 1.2) / 1000)
+        duration = words * SECONDS_PER_WORD
+        with open(audio_fname, "wb") as f:
+            f.write(b"ID3" + os.urandom(int(duration * BYTES_PER_SECOND)))
+        record("edge_tts", started)
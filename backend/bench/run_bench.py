@@ -0,0 +1,364 @@
+# backend/bench/run_bench.py
+# End-to-end latency benchmark: starts the fake Ollama / rgpv.ac.in servers and the real backend
+# (with fake edge-tts, ffmpeg and rhubarb), drives it with concurrent kiosk traffic across every mode
+# and writes p50/p95/p99 + throughput per stage as JSON.
+#
+#   python bench/run_bench.py --requests 300 --concurrency 8 --out bench_results.json
+#   python bench/run_bench.py --compare bench_results.json     # exit code 1 on a p95 regression
+#
+# Run from backend/. Needs the normal backend requirements (the embedding model stays real).
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import httpx
+
+from fake_servers import add_arguments
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+# mode -> questions that should land in it. Repeats are realistic: kiosks hear the same questions all day.
+CHAT_QUERIES = {
+    "map": ["Where is the library?", "route to girls hostel", "where is the canteen", "way to admin block"],
+    "bus": ["Which bus goes to Kolar?", "bus driver number for MP Nagar route", "college bus stops list"],
+    "hostel": ["What are the mess timings?", "hostel fees for girls", "warden contact of CV Raman hostel"],
+    "notice": ["Any notice about exam?", "latest result notice", "scholarship circular"],
+    "official": ["Who is the registrar?", "vice chancellor of the university", "list of directors"],
+    "rag": ["How do I apply for my degree online?", "What is the fee for transcripts?",
+            "minimum attendance required", "what happens if I fail the practical exam"],
+    "link": ["open the student login portal", "show my result"],
+}
+TTS_TEXTS = [
+    "The library is on the ground floor of the academic block and is open from nine to five.",
+    "Route number three goes to Kolar. The driver can be reached on the number shown on screen.",
+    "Breakfast is served from seven thirty. Lunch is from twelve thirty to two in the afternoon.",
+]
+DEFAULT_MIX = "map=2,bus=2,hostel=2,notice=1,official=1,rag=3,link=1,tts=2,tts_stream=2"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values: return None
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(samples, wall_seconds, errors=0, extra=None):
+    values = sorted(samples)
+    out = {
+        "count": len(values), "errors": errors,
+        "p50_ms": percentile(values, 0.50), "p95_ms": percentile(values, 0.95), "p99_ms": percentile(values, 0.99),
+        "mean_ms": sum(values) / len(values) if values else None, "max_ms": values[-1] if values else None,
+        "throughput_rps": len(values) / wall_seconds if wall_seconds else None,
+    }
+    out = {k: round(v, 2) if isinstance(v, float) else v for k, v in out.items()}
+    if extra: out.update(extra)
+    return out
+
+
+# ==========================================
+# 1. PROCESSES
+# ==========================================
+
+def make_wrapper(tmp_dir, name, script):
+    """fake_*.py -> something subprocess.run() can execute directly (no shell) on this OS."""
+    if platform.system() == "Windows":
+        path = os.path.join(tmp_dir, f"{name}.cmd")
+        with open(path, "w") as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\n')
+    else:
+        path = os.path.join(tmp_dir, name)
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(path, 0o755)
+    return path
+
+
+def start_processes(cfg, tmp_dir):
+    fake_args = [f"--{k.replace('_', '-')}={v}" for k, v in vars(cfg).items() if k in FAKE_OPTIONS]
+    fakes = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_servers.py"), *fake_args], cwd=BENCH_DIR)
+
+    rgpv = f"http://127.0.0.1:{cfg.rgpv_port}"
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([os.path.join(BENCH_DIR, "fakes"), os.environ.get("PYTHONPATH", "")]),
+        "OLLAMA_HOST": f"http://127.0.0.1:{cfg.ollama_port}",
+        "WEB_MIRRORS": f"www.rgpv.ac.in={rgpv},rgpv.ac.in={rgpv}",
+        "FFMPEG_PATH": make_wrapper(tmp_dir, "ffmpeg", os.path.join(BENCH_DIR, "bin", "fake_ffmpeg.py")),
+        "RHUBARB_PATH": make_wrapper(tmp_dir, "rhubarb", os.path.join(BENCH_DIR, "bin", "fake_rhubarb.py")),
+        # Keep fake notices / audio out of the real caches
+        "KIOSK_CACHE_DIR": os.path.join(tmp_dir, "cache"),
+        "KIOSK_AUDIO_DIR": os.path.join(tmp_dir, "audio"),
+        "BENCH_STAGE_LOG": os.path.join(tmp_dir, "stages.jsonl"),
+        "BENCH_FFMPEG_MS": str(cfg.ffmpeg_ms),
+        "BENCH_RHUBARB_MS_PER_SEC": str(cfg.rhubarb_ms_per_sec),
+        "BENCH_EDGE_TTS_MS": str(cfg.edge_tts_ms),
+    }
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(cfg.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    return fakes, backend, env["BENCH_STAGE_LOG"]
+
+
+async def wait_until_ready(client, url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if (await client.get(url)).status_code == 200: return
+        except httpx.HTTPError: pass
+        await asyncio.sleep(1)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+# ==========================================
+# 2. TRAFFIC
+# ==========================================
+
+class Results:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.counters = {}
+
+    def add(self, stage, ms):
+        self.samples.setdefault(stage, []).append(ms)
+
+    def error(self, stage):
+        self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def count(self, stage, name):
+        self.counters.setdefault(stage, {}).setdefault(name, 0)
+        self.counters[stage][name] += 1
+
+
+async def run_chat(client, base, mode, query, cfg, results, session_id):
+    body = {"text": query, "session_id": session_id}
+    stage = f"chat.{mode}"
+    started = time.perf_counter()
+    if not cfg.stream:
+        res = await client.post(f"{base}/chat", json=body)
+        data = res.json()
+        if res.status_code != 200 or data.get("reply") == "Error connecting to brain.": return results.error(stage)
+        results.add(stage, (time.perf_counter() - started) * 1000)
+        if data.get("cached"): results.count(stage, "cached")
+        elif data.get("context"): results.count(stage, "llm")
+        return
+
+    first_token = None
+    async with client.stream("POST", f"{base}/chat-stream", json=body) as res:
+        event = None
+        async for line in res.aiter_lines():
+            if line.startswith("event:"): event = line[6:].strip()
+            if event == "token" and first_token is None: first_token = time.perf_counter()
+            if event == "error": return results.error(stage)
+    results.add(stage, (time.perf_counter() - started) * 1000)
+    if first_token: results.add(f"{stage}.first_token", (first_token - started) * 1000)
+
+
+async def run_tts(client, base, text, results):
+    started = time.perf_counter()
+    res = await client.post(f"{base}/tts-eleven", json={"text": text})
+    if res.status_code == 503: return results.count("tts", "rejected_busy")
+    if res.status_code != 200 or "error" in res.json(): return results.error("tts")
+    results.add("tts", (time.perf_counter() - started) * 1000)
+
+
+async def run_tts_stream(client, base, text, results):
+    started = time.perf_counter()
+    first = None
+    async with client.stream("POST", f"{base}/tts-stream", json={"text": text}) as res:
+        if res.status_code == 503: return results.count("tts_stream", "rejected_busy")
+        async for line in res.aiter_lines():
+            if not line: continue
+            part = json.loads(line)
+            if "error" in part: return results.error("tts_stream")
+            if first is None and "audio_url" in part: first = time.perf_counter()
+    results.add("tts_stream", (time.perf_counter() - started) * 1000)
+    if first: results.add("tts_stream.first_segment", (first - started) * 1000)
+
+
+def parse_mix(value):
+    weights = {}
+    for pair in value.split(","):
+        name, _, weight = pair.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def drive(client, base, cfg, total, results, rng, counter):
+    weights = parse_mix(cfg.mix)
+    names, w = list(weights), list(weights.values())
+    # Each worker is one kiosk tab: the frontend keeps a single session id for the whole tab, so
+    # session memory and response cache see the same long-lived sessions as in production
+    session_id = str(uuid.uuid4())
+    while True:
+        n = counter[0]
+        if n >= total: return
+        counter[0] += 1
+        scenario = rng.choices(names, w)[0]
+        try:
+            if scenario == "tts":
+                # Unique text per request: otherwise everything after the first call is a TTS cache hit
+                await run_tts(client, base, f"{rng.choice(TTS_TEXTS)} Request {n}.", results)
+            elif scenario == "tts_stream":
+                await run_tts_stream(client, base, f"{rng.choice(TTS_TEXTS)} Request {n}.", results)
+            else:
+                query = rng.choice(CHAT_QUERIES[scenario])
+                if cfg.unique_queries: query += f" (ref {n})"
+                await run_chat(client, base, scenario, query, cfg, results, session_id)
+        except httpx.HTTPError:
+            results.error(scenario if scenario.startswith("tts") else f"chat.{scenario}")
+
+
+# ==========================================
+# 3. REPORT
+# ==========================================
+
+def stand_in_report(stats, stage_log, wall):
+    report = {name: summarize(s["samples_ms"], wall, extra={"peak_concurrency": s["peak_concurrency"]})
+              for name, s in stats.items()}
+    by_stage = {}
+    if os.path.exists(stage_log):
+        with open(stage_log, "r", encoding="utf-8") as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: continue
+                by_stage.setdefault(entry["stage"], []).append(entry["ms"])
+    for stage, samples in by_stage.items():
+        report[stage] = summarize(samples, wall)
+    return report
+
+
+def compare(current, baseline_path, tolerance):
+    """Prints p95 deltas per stage; returns the stages that got slower than `tolerance` allows."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\n{'stage':<32} {'base p95':>10} {'now p95':>10} {'delta':>8}", file=sys.stderr)
+    for section in ("stages", "stand_ins"):
+        for stage, now in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(stage)
+            if not before or not before.get("p95_ms") or now.get("p95_ms") is None: continue
+            delta = now["p95_ms"] / before["p95_ms"] - 1
+            flag = "❌" if delta > tolerance else ""
+            print(f"{stage:<32} {before['p95_ms']:>10.1f} {now['p95_ms']:>10.1f} {delta:>+7.0%} {flag}", file=sys.stderr)
+            if delta > tolerance: regressions.append(stage)
+    return regressions
+
+
+def print_table(report):
+    print(f"\n{'stage':<32} {'n':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>7}", file=sys.stderr)
+    for section in ("stages", "stand_ins"):
+        for stage, s in sorted(report[section].items()):
+            if not s["count"]: continue
+            print(f"{stage:<32} {s['count']:>5} {s['errors']:>4} {s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} "
+                  f"{s['p99_ms']:>8.1f} {s['throughput_rps']:>7.2f}", file=sys.stderr)
+
+
+async def main(cfg):
+    tmp_dir = tempfile.mkdtemp(prefix="kiosk_bench_")
+    base = cfg.server_url or f"http://127.0.0.1:{cfg.port}"
+    fake_base = f"http://127.0.0.1:{cfg.ollama_port}"
+    processes = []
+    stage_log = os.path.join(tmp_dir, "stages.jsonl")
+    try:
+        if not cfg.server_url:
+            fakes, backend, stage_log = start_processes(cfg, tmp_dir)
+            processes = [backend, fakes]
+        limits = httpx.Limits(max_connections=cfg.concurrency * 2)
+        async with httpx.AsyncClient(timeout=cfg.timeout, limits=limits) as client:
+            print(f"⏳ Waiting for backend at {base} (loads the embedding model)...", file=sys.stderr)
+            await wait_until_ready(client, f"{base}/ready", cfg.startup_timeout)  # model + index warmed up
+            if not cfg.server_url: await wait_until_ready(client, f"{fake_base}/_bench/stats", 30)
+
+            rng = random.Random(cfg.seed)
+            if cfg.warmup:
+                print(f"🔥 Warm-up: {cfg.warmup} requests", file=sys.stderr)
+                await asyncio.gather(*(drive(client, base, cfg, cfg.warmup, Results(), rng, [0])
+                                       for _ in range(cfg.concurrency)))
+            stats_url = f"{fake_base}/_bench/stats"
+            if not cfg.server_url:
+                await client.get(stats_url, params={"reset": "true"})
+                open(stage_log, "w").close()
+
+            print(f"🚀 {cfg.requests} requests, concurrency {cfg.concurrency}, mix {cfg.mix}", file=sys.stderr)
+            results = Results()
+            counter = [0]
+            started = time.perf_counter()
+            await asyncio.gather(*(drive(client, base, cfg, cfg.requests, results, rng, counter)
+                                   for _ in range(cfg.concurrency)))
+            wall = time.perf_counter() - started
+            stand_ins = {}
+            if not cfg.server_url:
+                stand_ins = stand_in_report((await client.get(stats_url)).json(), stage_log, wall)
+
+        stages = sorted(set(results.samples) | set(results.errors))
+        report = {
+            "config": {k: v for k, v in vars(cfg).items() if k not in ("out", "compare")},
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_seconds": round(wall, 2),
+            "total_throughput_rps": round(sum(len(v) for v in results.samples.values()) / wall, 2),
+            "stages": {s: summarize(results.samples.get(s, []), wall, results.errors.get(s, 0), results.counters.get(s))
+                       for s in stages},
+            "stand_ins": stand_ins,
+        }
+        # Counters recorded without a latency sample (e.g. only 503s)
+        for stage, counters in results.counters.items():
+            report["stages"].setdefault(stage, summarize([], wall, extra=counters))
+    finally:
+        for p in processes:
+            p.terminate()
+            try: p.wait(10)
+            except subprocess.TimeoutExpired: p.kill()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print_table(report)
+    text = json.dumps(report, indent=2)
+    if cfg.out:
+        with open(cfg.out, "w", encoding="utf-8") as f: f.write(text)
+        print(f"\n💾 Results written to {cfg.out}", file=sys.stderr)
+    else:
+        print(text)
+    if cfg.compare:
+        regressions = compare(report, cfg.compare, cfg.tolerance)
+        if regressions:
+            print(f"\n❌ p95 regressions over {cfg.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+FAKE_OPTIONS = {a.dest for a in add_arguments(argparse.ArgumentParser())._actions if a.dest != "help"}
+
+if __name__ == "__main__":
+    parser = add_arguments(argparse.ArgumentParser(description="Kiosk backend latency benchmark"))
+    parser.add_argument("--port", type=int, default=9100, help="port for the backend under test")
+    parser.add_argument("--server-url", help="benchmark an already running backend instead (no stand-ins started)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. rag=3,bus=1,tts=1")
+    parser.add_argument("--stream", action="store_true", help="use /chat-stream and record time to first token")
+    parser.add_argument("--unique-queries", action="store_true", help="defeat the response cache")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--ffmpeg-ms", type=float, default=120)
+    parser.add_argument("--rhubarb-ms-per-sec", type=float, default=250)
+    parser.add_argument("--edge-tts-ms", type=float, default=250)
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON report to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown before failing")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,5 +1,10 @@
 # backend/bus_data.py
 
+import os
+from structured_index import DatasetIndex
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
 BUS_ROUTES = [
     {
         "route_no": "1",
@@ -38,15 +43,16 @@ BUS_ROUTES = [
     }
 ]
 
+# Transport staff can publish routes as data/bus_routes.json or data/bus_routes.csv
+# (columns: route_no, destination, driver, phone, stops - stops separated by ';').
+# If neither file exists, the routes above are used.
+bus_index = DatasetIndex(
+    BUS_ROUTES,
+    paths=[os.path.join(DATA_DIR, "bus_routes.json"), os.path.join(DATA_DIR, "bus_routes.csv")],
+    fields={"route_no": 3.0, "destination": 2.0, "stops": 1.5},
+    list_fields=("stops",),
+)
+
 def search_bus(query):
-    query = query.lower()
-    results = []
-    
-    for bus in BUS_ROUTES:
-        # Check Route No, Destination, or Stops
-        if (bus["route_no"] in query) or \
-           (bus["destination"].lower() in query) or \
-           any(stop.lower() in query for stop in bus["stops"]):
-            results.append(bus)
-            
-    return results
\ No newline at end of file
+    # Ranked, typo-tolerant: "bairagad" still finds Bairagarh
+    return bus_index.search(query)
@@ -0,0 +1,66 @@
+# backend/calibrate_faq.py
+# Offline calibration of the FAQ direct-answer threshold (FAQ_DIRECT_THRESHOLD).
+# Labeled queries live in faq_eval.json: {"query": ..., "faq": <faqs.json question> or null}.
+# null means "must NOT be answered directly" (no FAQ covers it, the LLM + documents should).
+#
+#   python calibrate_faq.py [--eval faq_eval.json] [--margin 0.05] [--max-wrong-rate 0.0] [--backend onnx]
+# Calibrate with the backend the kiosk serves with (EMBED_BACKEND): int8 vectors score slightly differently.
+
+import os
+import json
+import argparse
+import numpy as np
+
+from faq_matcher import FAQMatcher, MARGIN
+from encoders import load_encoder, EMBED_BACKEND, BACKENDS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser(description="Pick the FAQ direct-answer threshold from a labeled query set.")
+parser.add_argument("--eval", default=os.path.join(BASE_DIR, "faq_eval.json"))
+parser.add_argument("--faqs", default=os.path.join(BASE_DIR, "faqs.json"))
+parser.add_argument("--margin", type=float, default=MARGIN)
+parser.add_argument("--max-wrong-rate", type=float, default=0.0, help="allowed share of direct answers that are wrong")
+parser.add_argument("--backend", default=EMBED_BACKEND, choices=list(BACKENDS))
+args = parser.parse_args()
+
+with open(args.eval, "r", encoding="utf-8") as f:
+    cases = json.load(f)
+
+encode = load_encoder(args.backend).encode
+
+matcher = FAQMatcher(encode, args.faqs)
+query_vectors = encode([c["query"] for c in cases])
+positives = sum(1 for c in cases if c["faq"])
+
+print(f"📋 {len(cases)} labeled queries ({positives} FAQ paraphrases, {len(cases) - positives} should go to the LLM)\n")
+print(f"{'threshold':>9} {'answered':>8} {'correct':>7} {'wrong':>5} {'precision':>9} {'coverage':>8}")
+
+best = None
+for threshold in np.arange(0.50, 0.96, 0.01):
+    answered = correct = 0
+    for case, vector in zip(cases, query_vectors):
+        faq, _ = matcher.match(vector, threshold=threshold, margin=args.margin)
+        if not faq: continue
+        answered += 1
+        if faq["question"] == case["faq"]: correct += 1
+    wrong = answered - correct
+    precision = correct / answered if answered else 1.0
+    coverage = correct / positives if positives else 0.0
+    print(f"{threshold:>9.2f} {answered:>8} {correct:>7} {wrong:>5} {precision:>9.2%} {coverage:>8.2%}")
+    # Lowest threshold (= most direct answers) whose wrong-answer rate is acceptable
+    if best is None and answered and wrong / answered <= args.max_wrong_rate:
+        best = (threshold, coverage)
+
+# Misses and false accepts at the recommended threshold, to grow faq_eval.json / faqs.json
+if best:
+    threshold, coverage = best
+    print(f"\n✅ Recommended: FAQ_DIRECT_THRESHOLD={threshold:.2f} FAQ_DIRECT_MARGIN={args.margin} (coverage {coverage:.0%})")
+    print("\n--- DETAILS AT RECOMMENDED THRESHOLD ---")
+    for case, vector in zip(cases, query_vectors):
+        faq, score = matcher.match(vector, threshold=threshold, margin=args.margin)
+        got = faq["question"] if faq else None
+        mark = "✅" if got == case["faq"] else ("⚠️" if got is None else "❌")
+        print(f"{mark} {score:.2f} {case['query']!r} -> {got!r}")
+else:
+    print("\n❌ No threshold meets the wrong-answer limit; add FAQ entries or raise --max-wrong-rate.")
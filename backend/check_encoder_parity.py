@@ -0,0 +1,102 @@
+# backend/check_encoder_parity.py
+# Compares the int8 ONNX encoder with the sentence-transformers one on the real knowledge base:
+# per-text cosine between the two vectors, and whether retrieval returns the same chunks.
+# Exits non-zero when parity is below the limits, so it can gate a model re-export.
+#
+#   python check_encoder_parity.py [--model-dir models/all-MiniLM-L6-v2-int8] [--k 3] [--min-overlap 0.9]
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from encoders import load_encoder, ONNX_MODEL_DIR
+from ingest import iter_chunks, format_chunk
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser(description="Check that the ONNX encoder retrieves like the torch encoder.")
+parser.add_argument("--model-dir", default=ONNX_MODEL_DIR)
+parser.add_argument("--faqs", default=os.path.join(BASE_DIR, "faqs.json"))
+parser.add_argument("--data", default=os.path.join(BASE_DIR, "data"))
+parser.add_argument("--eval", default=os.path.join(BASE_DIR, "faq_eval.json"), help="extra queries (faq_eval.json format)")
+parser.add_argument("--k", type=int, default=3, help="retrieval depth, as in RAGEngine.retrieve")
+parser.add_argument("--min-cosine", type=float, default=0.97, help="lowest allowed cosine(torch vector, onnx vector)")
+parser.add_argument("--min-overlap", type=float, default=0.9, help="mean share of torch top-k also in onnx top-k")
+parser.add_argument("--min-top1", type=float, default=0.95, help="share of queries with the same best chunk")
+args = parser.parse_args()
+
+documents = [format_chunk(c) for c in iter_chunks(args.faqs, args.data)]
+queries = []
+if os.path.exists(args.faqs):
+    with open(args.faqs, "r", encoding="utf-8") as f:
+        queries += [i["question"] for i in json.load(f) if i.get("question")]
+if os.path.exists(args.eval):
+    with open(args.eval, "r", encoding="utf-8") as f:
+        queries += [c["query"] for c in json.load(f)]
+if not documents or not queries:
+    sys.exit("❌ Need knowledge chunks and queries to compare")
+print(f"📚 {len(documents)} chunks, {len(queries)} queries\n")
+
+
+def measure(backend):
+    started = time.perf_counter()
+    encoder = load_encoder(backend, model_dir=args.model_dir)
+    load_s = time.perf_counter() - started
+    started = time.perf_counter()
+    doc_vectors = encoder.encode(documents)
+    corpus_s = time.perf_counter() - started
+    # One query at a time, like a kiosk request
+    latencies = []
+    query_vectors = []
+    for q in queries:
+        started = time.perf_counter()
+        query_vectors.append(encoder.encode([q])[0])
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"⏱️ {backend:>5}: load {load_s:.2f}s, corpus {corpus_s:.2f}s, "
+          f"query p50 {np.percentile(latencies, 50):.1f} ms / p95 {np.percentile(latencies, 95):.1f} ms")
+    return doc_vectors, np.array(query_vectors, dtype='float32')
+
+
+def top_k(doc_vectors, query_vectors, k):
+    # Same ranking as IndexFlatL2 over the engine's vectors
+    dists = (query_vectors ** 2).sum(1)[:, None] - 2 * query_vectors @ doc_vectors.T + (doc_vectors ** 2).sum(1)[None, :]
+    return np.argsort(dists, axis=1)[:, :k]
+
+
+def cosine(a, b):
+    return (a * b).sum(1) / np.maximum(np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12)
+
+
+ref_docs, ref_queries = measure("torch")
+onnx_docs, onnx_queries = measure("onnx")
+
+doc_cos = cosine(ref_docs, onnx_docs)
+query_cos = cosine(ref_queries, onnx_queries)
+k = min(args.k, len(documents))
+ref_top, onnx_top = top_k(ref_docs, ref_queries, k), top_k(onnx_docs, onnx_queries, k)
+overlaps = np.array([len(set(a) & set(b)) / k for a, b in zip(ref_top, onnx_top)])
+top1 = float(np.mean(ref_top[:, 0] == onnx_top[:, 0]))
+lowest_cos = float(min(doc_cos.min(), query_cos.min()))
+
+print(f"\n📐 cosine(torch, onnx): chunks mean {doc_cos.mean():.4f} min {doc_cos.min():.4f}, "
+      f"queries mean {query_cos.mean():.4f} min {query_cos.min():.4f}")
+print(f"🎯 top-{k} overlap {overlaps.mean():.2%}, same best chunk {top1:.2%}")
+
+# The queries whose results moved, to judge whether the difference matters
+for q, a, b, o in zip(queries, ref_top, onnx_top, overlaps):
+    if o < 1:
+        print(f"\n⚠️ {q!r} (overlap {o:.0%})")
+        print(f"   torch: {[documents[i][:60] for i in a]}")
+        print(f"   onnx : {[documents[i][:60] for i in b]}")
+
+failed = []
+if lowest_cos < args.min_cosine: failed.append(f"min cosine {lowest_cos:.4f} < {args.min_cosine}")
+if overlaps.mean() < args.min_overlap: failed.append(f"top-{k} overlap {overlaps.mean():.2%} < {args.min_overlap:.0%}")
+if top1 < args.min_top1: failed.append(f"best-chunk agreement {top1:.2%} < {args.min_top1:.0%}")
+if failed:
+    print("\n❌ Parity check failed: " + "; ".join(failed))
+    sys.exit(1)
+print("\n✅ ONNX encoder matches; safe to serve with EMBED_BACKEND=onnx")
@@ -0,0 +1,108 @@
+# backend/context_packer.py
+# Fits the CONTEXT DATA of a prompt into a per-mode token budget before it goes to llama3.
+# Prefill is most of the CPU-only Ollama latency, so every line we don't send is time saved.
+
+import os
+import re
+
+# Exact counts need the model's tokenizer (tokenizer.json, e.g. exported from Meta-Llama-3-8B).
+# Without it we estimate from word/punctuation pieces, which is close enough for budgeting.
+TOKENIZER_PATH = os.getenv("LLM_TOKENIZER_PATH", "")
+_tokenizer = None
+if TOKENIZER_PATH and os.path.exists(TOKENIZER_PATH):
+    try:
+        from tokenizers import Tokenizer
+        _tokenizer = Tokenizer.from_file(TOKENIZER_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not load tokenizer ({e}), using estimated token counts")
+
+# Per-mode CONTEXT DATA budgets in tokens (override with CONTEXT_BUDGET_<MODE>=n)
+DEFAULT_BUDGETS = {"map": 150, "bus": 500, "hostel": 600, "notice": 900, "official": 900, "rag": 1000}
+DEFAULT_BUDGET = 800
+
+# Ollama reallocates the KV cache (reloads the runner) when num_ctx changes, so keep the steps few.
+# A single value (LLM_NUM_CTX_STEPS=4096) pins the window.
+NUM_CTX_STEPS = tuple(int(x) for x in os.getenv("LLM_NUM_CTX_STEPS", "2048,4096,8192").split(","))
+RESPONSE_RESERVE = int(os.getenv("LLM_RESPONSE_RESERVE", "512"))  # room left for the generated answer
+
+BOILERPLATE = re.compile(
+    r"^(skip to (main )?content|home|menu|login|sitemap|search|print|back|next|previous|click here.*"
+    r"|read more|download|copyright.*|©.*|all rights reserved.*|page \d+( of \d+)?|\d{1,3})$",
+    re.I,
+)
+STOP_WORDS = {"the", "is", "a", "an", "of", "to", "for", "in", "on", "and", "or", "what", "who",
+              "where", "when", "how", "me", "my", "i", "about", "tell", "please", "are", "can", "do"}
+
+
+def count_tokens(text):
+    if not text: return 0
+    if _tokenizer: return len(_tokenizer.encode(text, add_special_tokens=False).ids)
+    # Roughly one token per short word / symbol, long words split every ~6 chars
+    return sum(1 + len(piece) // 6 for piece in re.findall(r"\w+|[^\w\s]", text))
+
+
+def budget_for(mode):
+    return int(os.getenv(f"CONTEXT_BUDGET_{mode.upper()}", DEFAULT_BUDGETS.get(mode, DEFAULT_BUDGET)))
+
+
+def pick_num_ctx(prompt_tokens, reserve=RESPONSE_RESERVE):
+    """Smallest context window that holds the prompt plus the answer (KV cache size = prefill cost)."""
+    for size in NUM_CTX_STEPS:
+        if prompt_tokens + reserve <= size: return size
+    return NUM_CTX_STEPS[-1]
+
+
+def _terms(text):
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOP_WORDS and len(w) > 1}
+
+
+def clean_lines(pieces, dedupe=True):
+    """Splits pieces into lines, dropping blanks, nav/footer boilerplate and (optionally) repeated lines."""
+    seen = set()
+    out = []
+    for rank, piece in enumerate(pieces):
+        for position, line in enumerate(piece.splitlines()):
+            line = re.sub(r"\s+", " ", line).strip()
+            key = line.lower().strip(" .:-|•")
+            if not key or BOILERPLATE.match(key) or (dedupe and key in seen): continue
+            seen.add(key)
+            out.append((rank, position, line))
+    return out
+
+
+def pack_context(pieces, query, budget, dedupe=True):
+    """
+    pieces: context strings, most relevant first (e.g. RAG hits in rank order).
+    Keeps the best lines that fit in `budget` tokens, in their original order.
+    A line's score = query terms it contains, then piece rank, then position (headers/titles come first).
+    Structured records (bus/hostel) pass dedupe=False: two hostels can share the same 'Fees:' line.
+    Returns (text, stats).
+    """
+    lines = clean_lines(pieces, dedupe)
+    query_terms = _terms(query)
+    total = sum(count_tokens(line) for _, _, line in lines)
+
+    if total <= budget:
+        kept = lines
+    else:
+        def score(item):
+            rank, position, line = item
+            return (len(query_terms & _terms(line)), position == 0, -rank, -position)
+        kept = set()
+        used = 0
+        for item in sorted(lines, key=score, reverse=True):
+            cost = count_tokens(item[2])
+            if used + cost > budget: continue
+            kept.add(item)
+            used += cost
+        kept = [item for item in lines if item in kept]
+
+    text = "\n".join(line for _, _, line in kept)
+    stats = {
+        "context_tokens": count_tokens(text),
+        "raw_tokens": sum(count_tokens(p) for p in pieces),
+        "budget": budget,
+        "lines_kept": len(kept),
+        "lines_dropped": len(lines) - len(kept),
+    }
+    return text, stats
@@ -0,0 +1,64 @@
+import sys
+import time
+import random
+import string
+
+from intent_router import IntentRouter, Rule, build_campus_router
+
+SMART_LINKS = ["login", "portal", "result", "time table", "syllabus", "calendar"]
+
+print("🔍 DEBUGGING INTENT ROUTER...")
+router = build_campus_router(SMART_LINKS)
+
+# 1. CASE TABLE: (query, intents that must match, intents that must NOT match, expected place)
+CASES = [
+    ("Where is the library?", {"map", "place"}, {"notice"}, "library"),
+    ("route to girls hostel", {"map", "bus", "hostel", "place"}, set(), "girls hostel"),
+    ("Where is the bus stop", {"map", "bus", "place"}, set(), "bus stop"),
+    ("Any notices about exams?", {"notice"}, {"map"}, None),
+    ("I need information about the library", {"place"}, {"notice"}, "library"),   # 'form' inside 'information'
+    ("When was the website updated", set(), {"notice"}, None),                     # 'date' inside 'updated'
+    ("Who is the VC?", {"governance"}, set(), None),
+    ("What are the mess timings", {"hostel"}, set(), None),
+    ("I got a message from the office", set(), {"hostel"}, None),                  # 'mess' inside 'message'
+    ("Show my results", {"link"}, set(), None),
+    ("Which buses go to Kolar", {"bus", "map"}, set(), None),
+    ("fruit juice in canteen", {"place"}, set(), "canteen"),                       # no 'uit' inside 'fruit'
+]
+
+failures = 0
+for query, must, must_not, place in CASES:
+    routed = router.route(query)
+    found = routed.intents()
+    best_place = routed.best("place")
+    ok = must <= found and not (must_not & found) and (place is None or (best_place and best_place.value == place))
+    if not ok: failures += 1
+    print(f"{'✅' if ok else '❌'} {query!r} -> {sorted(found)} place={best_place.value if best_place else None}")
+
+print(f"\n{len(CASES) - failures}/{len(CASES)} cases passed.")
+
+# 2. SPANS
+routed = router.route("Where is the girls hostel mess?")
+print("\n--- SPANS ---")
+for m in routed.matches:
+    print(f"{m.intent:<10} {m.keyword!r:<16} [{m.start}:{m.end}] priority={m.priority}")
+
+# 3. MICRO-BENCHMARK: latency should stay flat as the tables grow
+def bench(r, queries, rounds=2000):
+    start = time.perf_counter()
+    for i in range(rounds):
+        r.route(queries[i % len(queries)])
+    return (time.perf_counter() - start) / rounds * 1e6
+
+queries = [c[0] for c in CASES]
+print("\n--- BENCHMARK (µs per query) ---")
+print(f"campus tables:       {bench(router, queries):.1f}")
+
+random.seed(0)
+for size in (1000, 10000):
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 12))) for _ in range(size)]
+    big = IntentRouter([Rule(f"intent{i % 50}", None, [w]) for i, w in enumerate(words)])
+    print(f"{size:>6} keywords:      {bench(big, queries):.1f}")
+
+# Non-zero exit on any failing case, so this can gate a commit / CI run
+sys.exit(1 if failures else 0)
@@ -0,0 +1,59 @@
+import sys
+
+from session_store import SessionStore, is_follow_up
+from response_cache import ResponseCache
+
+HISTORY_TOKEN_BUDGET = 300  # as in main.py
+
+print("🔍 DEBUGGING SESSION HISTORY + RESPONSE CACHE...")
+
+# 1. CASE TABLE: does the question lean on the previous turn?
+CASES = [
+    ("Where is the library?", False),
+    ("What are the mess timings?", False),
+    ("Which bus goes to Kolar?", False),
+    ("and its fees?", True),
+    ("What about the girls hostel?", True),
+    ("who is the warden there", True),
+    ("tell me more", True),
+    ("fees?", True),
+]
+
+failures = 0
+for query, expected in CASES:
+    ok = is_follow_up(query) == expected
+    if not ok: failures += 1
+    print(f"{'✅' if ok else '❌'} {query!r} -> follow-up={is_follow_up(query)}")
+
+# 2. ONE KIOSK SESSION: the frontend keeps one session id per tab, so repeats must still hit the cache
+sessions = SessionStore()
+cache = ResponseCache(lambda mode: None)
+session_id = "kiosk-tab-1"
+conversation = [
+    ("Where is the library?", False),
+    ("What are the mess timings?", False),
+    ("Where is the library?", True),
+    ("and its fees?", False),            # follow-up: history reaches the prompt, never cached
+    ("What are the mess timings?", True),
+    ("and its fees?", False),
+]
+
+print("\n--- SAME SESSION, REPEATED QUESTIONS ---")
+for n, (query, expect_hit) in enumerate(conversation, start=1):
+    # Same rule as cache_lookup / cache_store in main.py
+    cacheable = not sessions.prompt_history(session_id, query, HISTORY_TOKEN_BUDGET)
+    hit = cache.get(query, ()) if cacheable else None
+    if hit is None:
+        reply = f"answer {n}"
+        if cacheable: cache.put(query, (), "rag", {"reply": reply})
+    else:
+        reply = hit["reply"]
+    sessions.add_turn(session_id, query, reply)
+    ok = (hit is not None) == expect_hit
+    if not ok: failures += 1
+    print(f"{'✅' if ok else '❌'} {query!r} cacheable={cacheable} hit={hit is not None}")
+
+print(f"\n{len(CASES) + len(conversation) - failures}/{len(CASES) + len(conversation)} checks passed. Cache: {cache.stats()}")
+
+# Non-zero exit on any failing check, so this can gate a commit / CI run
+sys.exit(1 if failures else 0)
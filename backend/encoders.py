@@ -0,0 +1,107 @@
+# backend/encoders.py
+# Sentence encoders for RAG, the intent classifier and the FAQ matcher. An encoder is any object with
+# a `name` and `encode(list of str) -> float32 array (n, dim)`; EMBED_BACKEND picks one from BACKENDS.
+# The name keys the on-disk vector cache, so switching backend re-encodes instead of mixing vectors.
+#   torch - sentence-transformers on PyTorch (default, no extra files needed)
+#   onnx  - the same model exported + int8-quantized by export_onnx.py, run with onnxruntime.
+#           No torch at serving time: smaller RSS, faster single-query encodes on kiosk CPUs.
+
+import os
+import json
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EMBED_MODEL = 'all-MiniLM-L6-v2'
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BASE_DIR, "models", f"{EMBED_MODEL}-int8"))
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = onnxruntime default (all physical cores)
+ONNX_BATCH_SIZE = int(os.getenv("ONNX_BATCH_SIZE", "32"))
+
+ONNX_FILE = "model.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+META_FILE = "encoder.json"
+
+
+class SentenceTransformerEncoder:
+    def __init__(self, model_name=EMBED_MODEL):
+        from sentence_transformers import SentenceTransformer  # pulls in torch: seconds on a kiosk CPU
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts):
+        return self.model.encode(texts, convert_to_numpy=True).astype('float32')
+
+
+class OnnxEncoder:
+    """
+    Runs an export_onnx.py model directory: model.onnx (int8), tokenizer.json and encoder.json
+    (max length, pooling, normalize). Pooling is done here in numpy, exactly like sentence-transformers.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, threads=ONNX_THREADS, batch_size=ONNX_BATCH_SIZE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        meta_path = os.path.join(model_dir, META_FILE)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"No ONNX encoder in {model_dir} - run: python export_onnx.py --out {model_dir}")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.name = f"{self.meta['model']}@onnx-{self.meta.get('quantization', 'fp32')}"
+        self.dim = self.meta["dim"]
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.meta["max_length"])
+        self.tokenizer.no_padding()  # padded per batch below, to the longest text rather than max_length
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads: options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(os.path.join(model_dir, ONNX_FILE), options, providers=["CPUExecutionProvider"])
+        self.inputs = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype='float32')
+        # Similar lengths share a batch, so short queries aren't padded to a long chunk's width
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in rows])
+            width = max(len(e.ids) for e in encodings)
+            ids = np.zeros((len(rows), width), dtype='int64')
+            mask = np.zeros((len(rows), width), dtype='int64')
+            types = np.zeros((len(rows), width), dtype='int64')
+            for r, e in enumerate(encodings):
+                ids[r, :len(e.ids)] = e.ids
+                mask[r, :len(e.ids)] = e.attention_mask
+                types[r, :len(e.ids)] = e.type_ids
+            feed = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self.inputs: feed["token_type_ids"] = types
+            hidden = self.session.run(None, feed)[0]
+            out[rows] = self.pool(hidden, mask)
+        return out
+
+    def pool(self, hidden, mask):
+        if self.meta.get("pooling", "mean") == "cls":
+            pooled = hidden[:, 0]
+        else:
+            weights = mask[..., None].astype('float32')
+            pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        if self.meta.get("normalize", True):
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype('float32')
+
+
+BACKENDS = {"torch": SentenceTransformerEncoder, "onnx": OnnxEncoder}
+
+
+def load_encoder(backend=EMBED_BACKEND, model_name=EMBED_MODEL, model_dir=ONNX_MODEL_DIR):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBED_BACKEND '{backend}' (choose from {', '.join(BACKENDS)})")
+    print(f"⚙️ Loading {model_name} encoder ({backend})...")
+    if backend == "torch": return SentenceTransformerEncoder(model_name)
+    encoder = BACKENDS[backend](model_dir)
+    if encoder.meta["model"] != model_name:
+        raise ValueError(f"{model_dir} holds {encoder.meta['model']}, expected {model_name}")
+    return encoder
@@ -0,0 +1,80 @@
+# backend/export_onnx.py
+# One-off conversion for EMBED_BACKEND=onnx: exports the sentence-transformers model to ONNX and
+# quantizes the weights to int8. Needs torch + onnx + onnxruntime here; the kiosk then only needs
+# onnxruntime + tokenizers. Check the result with check_encoder_parity.py before switching.
+#
+#   python export_onnx.py [--model all-MiniLM-L6-v2] [--out models/all-MiniLM-L6-v2-int8] [--keep-fp32]
+
+import os
+import json
+import argparse
+
+from encoders import EMBED_MODEL, ONNX_MODEL_DIR, ONNX_FILE, TOKENIZER_FILE, META_FILE
+
+parser = argparse.ArgumentParser(description="Export the RAG embedding model to an int8 ONNX encoder.")
+parser.add_argument("--model", default=EMBED_MODEL)
+parser.add_argument("--out", default=ONNX_MODEL_DIR)
+parser.add_argument("--opset", type=int, default=17)
+parser.add_argument("--keep-fp32", action="store_true", help="also keep model.fp32.onnx (for parity debugging)")
+args = parser.parse_args()
+
+import torch
+from sentence_transformers import SentenceTransformer
+from onnxruntime.quantization import quantize_dynamic, QuantType
+
+os.makedirs(args.out, exist_ok=True)
+print(f"⚙️ Loading {args.model}...")
+st = SentenceTransformer(args.model, device="cpu")
+transformer = st[0].auto_model.eval()
+tokenizer = st.tokenizer
+modules = [type(m).__name__ for m in st]
+pooling = st[1].get_pooling_mode_str() if len(st) > 1 and hasattr(st[1], "get_pooling_mode_str") else "mean"
+if pooling not in ("mean", "cls"):
+    raise SystemExit(f"❌ Pooling '{pooling}' is not supported by OnnxEncoder")
+
+
+class Backbone(torch.nn.Module):
+    # Only last_hidden_state is exported; pooling + normalize run in numpy (OnnxEncoder.pool)
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)[0]
+
+
+sample = tokenizer(["where is the library", "hostel fees and warden contact"], padding=True, return_tensors="pt")
+fp32_path = os.path.join(args.out, "model.fp32.onnx")
+print(f"📦 Exporting to ONNX (opset {args.opset})...")
+dynamic = {"input_ids": {0: "batch", 1: "tokens"}, "attention_mask": {0: "batch", 1: "tokens"},
+           "token_type_ids": {0: "batch", 1: "tokens"}, "last_hidden_state": {0: "batch", 1: "tokens"}}
+with torch.no_grad():
+    torch.onnx.export(
+        Backbone(transformer), (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]), fp32_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"], output_names=["last_hidden_state"],
+        dynamic_axes=dynamic, opset_version=args.opset, do_constant_folding=True, dynamo=False,
+    )
+
+print("🗜️ Quantizing weights to int8...")
+quantize_dynamic(fp32_path, os.path.join(args.out, ONNX_FILE), weight_type=QuantType.QInt8)
+if not args.keep_fp32: os.remove(fp32_path)
+
+# tokenizer.json is all the `tokenizers` package needs at serving time
+tokenizer.save_pretrained(args.out)
+if not os.path.exists(os.path.join(args.out, TOKENIZER_FILE)):
+    raise SystemExit("❌ No fast tokenizer (tokenizer.json) for this model; OnnxEncoder can't use it")
+
+meta = {
+    "model": args.model,
+    "dim": st.get_sentence_embedding_dimension(),
+    "max_length": st.max_seq_length,
+    "pooling": pooling,
+    "normalize": "Normalize" in modules,
+    "quantization": "int8",
+}
+with open(os.path.join(args.out, META_FILE), "w", encoding="utf-8") as f:
+    json.dump(meta, f, indent=2)
+
+size = os.path.getsize(os.path.join(args.out, ONNX_FILE)) / 1024 / 1024
+print(f"✅ Saved {args.out} ({size:.1f} MB). Verify: python check_encoder_parity.py --model-dir {args.out}")
+print(f"   Then serve with EMBED_BACKEND=onnx ONNX_MODEL_DIR={args.out}")
@@ -0,0 +1,81 @@
+# backend/faq_matcher.py
+# Direct-answer path: when a query is a near-paraphrase of a faqs.json question, return the stored
+# answer instead of retrieving + running llama3. Thresholds come from calibrate_faq.py.
+
+import os
+import json
+import threading
+import numpy as np
+
+from intent_classifier import normalize_rows
+
+ENABLED = os.getenv("FAQ_DIRECT", "1") == "1"
+THRESHOLD = float(os.getenv("FAQ_DIRECT_THRESHOLD", "0.82"))  # cosine(query, FAQ question)
+MARGIN = float(os.getenv("FAQ_DIRECT_MARGIN", "0.05"))        # lead needed over the next best FAQ
+
+
+class FAQMatcher:
+    """Question embeddings of faqs.json, re-encoded when the file changes (admin edits, KB watcher)."""
+
+    def __init__(self, encode, json_file, threshold=THRESHOLD, margin=MARGIN):
+        self.encode = encode
+        self.json_file = json_file
+        self.threshold = threshold
+        self.margin = margin
+        self.items = []
+        self.matrix = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def file_mtime(self):
+        try:
+            return os.stat(self.json_file).st_mtime
+        except OSError:
+            return None
+
+    def refresh(self):
+        mtime = self.file_mtime()
+        if mtime == self._mtime: return
+        with self._lock:
+            if mtime == self._mtime: return
+            items = []
+            if mtime is not None:
+                try:
+                    with open(self.json_file, "r", encoding="utf-8") as f:
+                        items = [i for i in json.load(f) if i.get("question") and i.get("answer")]
+                except Exception as e:
+                    print(f"⚠️ FAQ matcher could not read {self.json_file}: {e}")
+            matrix = normalize_rows(self.encode([i["question"] for i in items])) if items else None
+            self.items, self.matrix, self._mtime = items, matrix, mtime
+
+    def scores(self, query_vector):
+        """[(faq item, cosine)] best first."""
+        self.refresh()
+        items, matrix = self.items, self.matrix
+        if matrix is None: return []
+        sims = matrix @ normalize_rows(query_vector).reshape(-1)
+        order = np.argsort(-sims)
+        return [(items[i], float(sims[i])) for i in order]
+
+    def match(self, query_vector, threshold=None, margin=None):
+        """Returns (faq item, score) when the top FAQ is confident enough, else (None, score)."""
+        threshold = self.threshold if threshold is None else threshold
+        margin = self.margin if margin is None else margin
+        ranked = self.scores(query_vector)
+        if not ranked: return None, 0.0
+        best, score = ranked[0]
+        # Two FAQs with different answers scoring alike (fee vs process for revaluation) -> let the LLM decide
+        runner_up = next((s for item, s in ranked[1:] if item["answer"] != best["answer"]), 0.0)
+        if score < threshold or score - runner_up < margin: return None, score
+        return best, score
+
+    def version(self):
+        """
+        Changes whenever faqs.json does (used to invalidate cached FAQ answers).
+        Just a stat: it runs on the event loop under the response cache lock, re-encoding is left to match().
+        """
+        return self.file_mtime()
+
+    def answers(self):
+        self.refresh()
+        return [i["answer"] for i in self.items]
@@ -0,0 +1,137 @@
+# backend/governance_store.py
+# Offline copies of the governance pages (Registrar, VC, ...), pre-crawled on a schedule.
+# Governance answers come from the local snapshot, so they are instant and work with no internet.
+
+import os
+import json
+import time
+import asyncio
+
+from rgpv_scraper import DIRECT_URLS, fetch_and_clean_page, find_official_page
+
+CRAWL_INTERVAL = int(os.getenv("GOV_CRAWL_INTERVAL", "86400"))  # seconds between full pre-crawls
+LIVE_REFRESH_AFTER = int(os.getenv("GOV_LIVE_REFRESH_AFTER", "3600"))  # older page -> refresh in background after answering
+KEEP_VERSIONS = int(os.getenv("GOV_SNAPSHOT_KEEP", "5"))
+SNAPSHOT_DIR = os.path.join(os.getenv("KIOSK_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")), "governance")
+
+
+class GovernanceSnapshotStore:
+    """
+    Every crawl writes a new version file (v<timestamp>.json: url -> {text, fetched_at}).
+    Roles without a direct link are stored under "role:<name>" with the page they were found on.
+    Pages that fail during a crawl are carried over from the previous version, so a flaky
+    network never makes the kiosk forget what it knew. Only the newest KEEP_VERSIONS are kept.
+    """
+
+    def __init__(self, snapshot_dir):
+        self.snapshot_dir = snapshot_dir
+        self.pages = {}
+        self.version = None
+        self._refreshing = set()  # urls with a background refresh in flight
+        self._tasks = set()       # strong refs, so the loop can't garbage-collect a running refresh
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self.load()
+
+    def versions(self):
+        return sorted(f for f in os.listdir(self.snapshot_dir) if f.startswith("v") and f.endswith(".json"))
+
+    def load(self):
+        for filename in reversed(self.versions()):
+            try:
+                with open(os.path.join(self.snapshot_dir, filename), "r", encoding="utf-8") as f:
+                    self.pages = json.load(f)
+                self.version = filename
+                print(f"🏛️ Loaded governance snapshot {filename} ({len(self.pages)} pages).")
+                return
+            except Exception: continue
+
+    def write_version(self, pages):
+        filename = f"v{int(time.time() * 1000)}.json"
+        tmp = os.path.join(self.snapshot_dir, filename + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.snapshot_dir, filename))
+        self.pages, self.version = pages, filename
+
+        for old in self.versions()[:-KEEP_VERSIONS]:
+            try: os.remove(os.path.join(self.snapshot_dir, old))
+            except OSError: pass
+
+    async def crawl(self):
+        urls = sorted(set(DIRECT_URLS.values()))
+        print(f"🕸️ Pre-crawling {len(urls)} governance pages...")
+        texts = await asyncio.gather(*(fetch_and_clean_page(url) for url in urls))
+
+        pages = dict(self.pages)
+        fresh = 0
+        for url, text in zip(urls, texts):
+            if text:
+                pages[url] = {"text": text, "fetched_at": time.time()}
+                fresh += 1
+        if fresh: self.write_version(pages)
+        print(f"✅ Governance crawl done: {fresh}/{len(urls)} pages updated.")
+        return fresh
+
+    async def refresh_page(self, url):
+        try:
+            text = await fetch_and_clean_page(url)
+            if text:
+                pages = dict(self.pages)
+                pages[url] = {"text": text, "fetched_at": time.time()}
+                self.write_version(pages)
+        except Exception as e:
+            print(f"⚠️ Governance refresh failed for {url}: {e}")
+        finally:
+            self._refreshing.discard(url)
+
+    def schedule_refresh(self, url):
+        """Refreshes `url` in the background, at most one refresh per page at a time."""
+        if url in self._refreshing: return
+        self._refreshing.add(url)
+        task = asyncio.create_task(self.refresh_page(url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def official_profile(self, role_name, live_refresh=True):
+        """
+        Snapshot first; live scrape (direct link, then search) only if we have never seen the page.
+        A live result is saved as a new version, so the next ask (or a restart offline) is a snapshot hit.
+        """
+        url = DIRECT_URLS.get(role_name)
+        key = url or f"role:{role_name}"
+        page = self.pages.get(key)
+        if page:
+            print(f"🏛️ Governance snapshot hit: '{role_name}'")
+            # Search-found pages aren't re-crawled; they stay until a live scrape replaces them
+            if url and live_refresh and time.time() - page["fetched_at"] > LIVE_REFRESH_AFTER:
+                self.schedule_refresh(url)
+            return f"OFFICIAL SOURCE: {page.get('source', key)}\nPAGE DATA:\n{page['text']}"
+
+        source, text = await find_official_page(role_name)
+        if not text: return "Could not find the official page."
+        pages = dict(self.pages)
+        pages[key] = {"text": text, "fetched_at": time.time(), "source": source}
+        try:
+            self.write_version(pages)
+        except OSError as e:
+            print(f"⚠️ Could not save governance page for '{role_name}': {e}")
+        return f"OFFICIAL SOURCE: {source}\nPAGE DATA:\n{text}"
+
+    def age(self):
+        if not self.version: return float("inf")
+        return time.time() - int(self.version[1:-len(".json")]) / 1000
+
+    async def run(self, interval=CRAWL_INTERVAL):
+        """Background loop: crawl every `interval` seconds (first one right away unless the snapshot is recent)."""
+        if self.age() < interval: await asyncio.sleep(interval - self.age())
+        while True:
+            try:
+                await self.crawl()
+            except Exception as e:
+                print(f"⚠️ Governance crawler error: {e}")
+            await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    # One-off crawl, e.g. from Task Scheduler / cron on a machine that has internet
+    asyncio.run(GovernanceSnapshotStore(SNAPSHOT_DIR).crawl())
@@ -1,5 +1,10 @@
 # backend/hostel_data.py
 
+import os
+from structured_index import DatasetIndex
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
 HOSTEL_DATA = [
     # --- BOYS HOSTELS ---
     {
@@ -70,15 +75,25 @@ HOSTEL_RULES = [
     "🔇 Noise: Silence hours must be maintained after 10:30 PM."
 ]
 
+# Hostel list can be published as data/hostels.json or data/hostels.csv
+# (columns: name, type, warden, phone, fees, capacity, facilities - facilities separated by ';').
+hostel_index = DatasetIndex(
+    HOSTEL_DATA,
+    paths=[os.path.join(DATA_DIR, "hostels.json"), os.path.join(DATA_DIR, "hostels.csv")],
+    fields={"name": 2.0},
+)
+
 def search_hostel(query):
     query = query.lower()
-    results = []
     
-    # 1. Search for specific hostels
-    for hostel in HOSTEL_DATA:
-        if (hostel["name"].lower() in query) or \
-           (hostel["type"].lower() in query and "hostel" in query):
-            results.append(hostel)
+    # 1. Search for specific hostels (ranked, typo-tolerant, partial names like "kalam hostel" work)
+    results = hostel_index.search(query)
+
+    # "girls hostel" / "boys hostel" -> every hostel of that type
+    if "hostel" in query:
+        for hostel in hostel_index.all():
+            if hostel["type"].lower() in query.split() and hostel not in results:
+                results.append(hostel)
 
     # 2. Check for Rules or Timings
     extra_info = {}
@@ -0,0 +1,134 @@
+# backend/http_client.py
+# Shared async HTTP clients (connection pooling + timeouts + retries) for Ollama and the university website.
+
+import os
+import time
+import asyncio
+import httpx
+
+RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+RETRY_BACKOFF = 0.5  # seconds, doubled on every attempt
+RETRY_STATUS = {502, 503, 504}
+# Errors where the request most likely never reached the server, so trying again is safe
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+
+LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60)
+
+# Optional host -> base URL rewrites for the scraper, e.g. a local mirror of the university site or the
+# benchmark stand-in: WEB_MIRRORS="www.rgpv.ac.in=http://127.0.0.1:9100,rgpv.ac.in=http://127.0.0.1:9100"
+WEB_MIRRORS = {
+    host.strip(): httpx.URL(target.strip())
+    for host, _, target in (pair.partition("=") for pair in os.getenv("WEB_MIRRORS", "").split(",") if "=" in pair)
+}
+
+_clients = {}
+
+
+def ollama_client():
+    """Long read timeout: llama3 on CPU can take a while before the full reply is ready."""
+    if "ollama" not in _clients:
+        _clients["ollama"] = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=5, read=float(os.getenv("OLLAMA_TIMEOUT", "120")), write=10, pool=10),
+            limits=LIMITS,
+        )
+    return _clients["ollama"]
+
+
+class MirrorTransport(httpx.AsyncBaseTransport):
+    """Sends requests for hosts in `mirrors` to the mapped base URL (path and query are kept)."""
+
+    def __init__(self, mirrors, transport):
+        self.mirrors = mirrors
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        target = self.mirrors.get(request.url.host)
+        if target:
+            request.url = request.url.copy_with(scheme=target.scheme, host=target.host, port=target.port)
+            request.headers["Host"] = target.netloc.decode("ascii")
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def web_client():
+    """For scraping rgpv.ac.in (their certificate chain is broken, hence verify=False like before)."""
+    if "web" not in _clients:
+        transport = None
+        if WEB_MIRRORS: transport = MirrorTransport(WEB_MIRRORS, httpx.AsyncHTTPTransport(verify=False, limits=LIMITS))
+        _clients["web"] = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=5, read=15, write=10, pool=10),
+            limits=LIMITS,
+            verify=False,
+            follow_redirects=True,
+            transport=transport,
+        )
+    return _clients["web"]
+
+
+async def request(client, method, url, retries=RETRIES, **kwargs):
+    """client.request() with retry + exponential backoff on connection errors and 502/503/504."""
+    for attempt in range(retries + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUS or attempt == retries: return response
+        except RETRY_ERRORS:
+            if attempt == retries: raise
+        await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+
+class ScraperClient:
+    """
+    Keep-alive client for one website that needs a cookie warm-up (rgpv.ac.in wants its session cookie
+    before it serves inner pages). The warm-up GET happens once and is only repeated when the cookies
+    expire or are older than `cookie_ttl`. Requests per host are capped at `per_host` at a time.
+    """
+
+    def __init__(self, warmup_url, headers=None, cookie_ttl=900, per_host=4):
+        self.warmup_url = warmup_url
+        self.warmup_host = httpx.URL(warmup_url).host
+        self.headers = headers or {}
+        self.cookie_ttl = cookie_ttl
+        self.per_host = per_host
+        self._warmed_at = 0
+        self._warm_lock = asyncio.Lock()
+        self._host_limits = {}
+
+    def _cookies_valid(self):
+        if time.time() - self._warmed_at > self.cookie_ttl: return False
+        cookies = [c for c in web_client().cookies.jar if self.warmup_host.endswith(c.domain.lstrip("."))]
+        return not any(c.is_expired() for c in cookies)
+
+    async def warm_up(self, force=False):
+        if not force and self._cookies_valid(): return
+        async with self._warm_lock:
+            # Someone else may have warmed up while we waited for the lock
+            if not force and self._cookies_valid(): return
+            await self._get(self.warmup_url)
+            self._warmed_at = time.time()
+
+    def _limit(self, url):
+        host = httpx.URL(url).host
+        if host not in self._host_limits: self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def _get(self, url, headers=None):
+        async with self._limit(url):
+            return await request(web_client(), "GET", url, headers={**self.headers, **(headers or {})})
+
+    async def get(self, url, headers=None, warm=True):
+        is_warmup_page = url == self.warmup_url
+        if warm and not is_warmup_page and httpx.URL(url).host == self.warmup_host:
+            try: await self.warm_up()
+            except httpx.HTTPError: pass  # the page itself may still work without cookies
+        response = await self._get(url, headers)
+        # Fetching the homepage for its own sake (notices) counts as a warm-up too
+        if is_warmup_page and response.status_code == 200: self._warmed_at = time.time()
+        return response
+
+
+async def close_all():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
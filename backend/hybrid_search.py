@@ -0,0 +1,108 @@
+# backend/hybrid_search.py
+# Lexical side of RAG retrieval + the fusion step. Embeddings blur exact tokens ("Rs. 250", route 12,
+# form names), BM25 doesn't; each candidate gets a blend of both scores, weak ones are cut off and
+# near-duplicates are dropped with MMR so the three context slots hold three different facts.
+
+import os
+import math
+import heapq
+import numpy as np
+
+from structured_index import tokenize
+from context_packer import STOP_WORDS
+from intent_classifier import normalize_rows
+
+LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "0.3"))  # 0 = pure vectors, 1 = pure BM25
+MIN_SCORE = float(os.getenv("RETRIEVE_MIN_SCORE", "0.25"))         # blended score a chunk needs to be used
+CANDIDATES = int(os.getenv("RETRIEVE_CANDIDATES", "20"))           # taken from each side before fusion
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))                 # relevance vs. novelty
+DUPLICATE_SIM = float(os.getenv("MMR_DUPLICATE_SIM", "0.95"))      # same text from two sources -> keep one
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def terms(text):
+    return [t for t in tokenize(text) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    postings: term -> {chunk id: term frequency}, updated chunk by chunk alongside the FAISS index.
+    Not thread-safe on its own; RAGEngine calls it under its lock.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.lengths = {}  # chunk id -> number of terms
+        self.total_length = 0
+
+    def add(self, doc_id, text):
+        words = terms(text)
+        self.lengths[doc_id] = len(words)
+        self.total_length += len(words)
+        counts = {}
+        for w in words: counts[w] = counts.get(w, 0) + 1
+        for w, tf in counts.items():
+            self.postings.setdefault(w, {})[doc_id] = tf
+
+    def remove(self, doc_id, text):
+        length = self.lengths.pop(doc_id, None)
+        if length is None: return
+        self.total_length -= length
+        for w in set(terms(text)):
+            docs = self.postings.get(w)
+            if docs is None: continue
+            docs.pop(doc_id, None)
+            if not docs: del self.postings[w]
+
+    def search(self, query, limit=CANDIDATES):
+        """[(chunk id, bm25 score)] best first."""
+        n = len(self.lengths)
+        if not n: return []
+        avg_length = self.total_length / n
+        scores = {}
+        for w in set(terms(query)):
+            docs = self.postings.get(w)
+            if not docs: continue
+            # Terms in most chunks ('university', 'rgpv') add ~nothing but cost a full postings scan
+            if len(docs) > n / 2 and n > 10: continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0) + idf * tf * (BM25_K1 + 1) / norm
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+def fuse(query_vector, dense_ids, lexical, vectors, k, lexical_weight=LEXICAL_WEIGHT,
+         min_score=MIN_SCORE, mmr_lambda=MMR_LAMBDA, duplicate_sim=DUPLICATE_SIM):
+    """
+    Blends both candidate lists and picks `k` with MMR. Returns [(chunk id, score)].
+    Cosine is recomputed for every candidate (lexical-only ones too) from `vectors` (id -> embedding),
+    so both sides are on one absolute scale; BM25 is scaled by the query's best BM25 score.
+    """
+    candidates = list(dict.fromkeys([*dense_ids, *(i for i, _ in lexical)]))
+    candidates = [i for i in candidates if i in vectors]
+    if not candidates: return []
+    matrix = normalize_rows(np.stack([vectors[i] for i in candidates]))
+    cosine = matrix @ normalize_rows(query_vector).reshape(-1)
+    best_lexical = max((s for _, s in lexical), default=0.0)
+    lexical_scores = dict(lexical)
+    scores = np.array([
+        (1 - lexical_weight) * float(c) + lexical_weight * (lexical_scores.get(i, 0.0) / best_lexical if best_lexical else 0.0)
+        for i, c in zip(candidates, cosine)
+    ])
+
+    keep = [j for j in np.argsort(-scores) if scores[j] >= min_score]
+    selected = []
+    while keep and len(selected) < k:
+        if not selected:
+            pick = keep[0]
+        else:
+            # Highest score after a penalty for resembling what was already picked
+            redundancy = (matrix[keep] @ matrix[selected].T).max(axis=1)
+            mmr = mmr_lambda * scores[keep] - (1 - mmr_lambda) * redundancy
+            pick = keep[int(np.argmax(mmr))]
+        keep.remove(pick)
+        selected.append(pick)
+        keep = [j for j in keep if float(matrix[j] @ matrix[pick]) < duplicate_sim]
+    return [(candidates[j], float(scores[j])) for j in selected]
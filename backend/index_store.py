@@ -0,0 +1,178 @@
+# backend/index_store.py
+# On-disk cache for the RAG index, so a kiosk reboot doesn't re-encode the whole knowledge base.
+
+import os
+import json
+import math
+import hashlib
+import numpy as np
+
+META_FILE = "meta.json"
+VECTORS_FILE = "embeddings.npy"
+INDEX_FILE = "index.faiss"
+
+# Exact search is fine for a few thousand chunks; years of circulars need an ANN index.
+ANN_MIN_CHUNKS = int(os.getenv("ANN_MIN_CHUNKS", "50000"))  # switch from flat to ANN_INDEX at this size
+ANN_INDEX = os.getenv("ANN_INDEX", "ivf")                   # ivf (supports removal) or hnsw (faster, tombstoned)
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))             # IVF lists scanned per query
+HNSW_M = int(os.getenv("HNSW_M", "32"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+
+
+def new_index(dim):
+    # IDMap so live updates can remove a document's vectors without rebuilding
+    import faiss  # imported on first use so the server starts before faiss/BLAS is loaded
+    return faiss.IndexIDMap(faiss.IndexFlatL2(dim))
+
+
+def index_kind(n, current=None):
+    """Index type for `n` chunks. Drops back to flat only well under the threshold, so it doesn't flap."""
+    if current not in (None, "flat") and n >= ANN_MIN_CHUNKS * 0.8: return ANN_INDEX
+    return ANN_INDEX if n >= ANN_MIN_CHUNKS else "flat"
+
+
+def ivf_lists(n):
+    # ~4*sqrt(n) lists, with enough training points per list for k-means
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+
+def _inner(index):
+    import faiss
+    return faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+
+
+def kind_of(index):
+    import faiss
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexHNSW): return "hnsw"
+    if isinstance(inner, faiss.IndexIVF): return "ivf"
+    return "flat"
+
+
+def tune(index):
+    """Search-time knobs aren't (all) saved with the index; set them after every build/load."""
+    import faiss
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexIVF): inner.nprobe = ANN_NPROBE
+    if isinstance(inner, faiss.IndexHNSW): inner.hnsw.efSearch = HNSW_EF_SEARCH
+    return index
+
+
+def build_index(vectors, ids):
+    """FAISS index over (vectors, ids) sized for the corpus: flat, IVF (trained here) or HNSW."""
+    import faiss
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+    ids = np.asarray(ids, dtype='int64')
+    dim = vectors.shape[1]
+    kind = index_kind(len(ids))
+    if kind == "ivf":
+        index = faiss.index_factory(dim, f"IVF{ivf_lists(len(ids))},Flat")
+        index.train(vectors)
+    elif kind == "hnsw":
+        index = faiss.index_factory(dim, f"IDMap,HNSW{HNSW_M},Flat")
+    else:
+        index = new_index(dim)
+    index.add_with_ids(vectors, ids)
+    if kind != "flat": print(f"🧭 Built {kind.upper()} index over {len(ids)} chunks")
+    return tune(index)
+
+
+def remove_ids(index, ids):
+    """HNSW graphs can't delete; their stale entries stay until needs_rebuild() says so (hits are filtered)."""
+    if kind_of(index) != "hnsw": index.remove_ids(np.array(ids, dtype='int64'))
+
+
+def needs_rebuild(index, n):
+    kind = kind_of(index)
+    if kind != index_kind(n, kind): return True
+    if index.ntotal > n * 1.2 + 100: return True  # deleted vectors piling up in an HNSW graph
+    if kind == "ivf" and _inner(index).nlist < ivf_lists(n) / 2: return True  # corpus outgrew its lists
+    return False
+
+
+def doc_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IndexStore:
+    """
+    Saves the FAISS index, the document list and one embedding per document.
+    Every embedding is keyed by the hash of its document text, so on the next boot
+    only new or edited documents have to go through the model again.
+    """
+
+    def __init__(self, cache_dir, model_name):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def load(self):
+        """Returns (meta, embeddings) from the last save. Empty if cache is missing or from another model."""
+        try:
+            with open(self._path(META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model") != self.model_name: return {}, None
+            vectors = np.load(self._path(VECTORS_FILE))
+            if len(vectors) != len(meta["hashes"]): return {}, None
+            return meta, vectors
+        except Exception:
+            return {}, None
+
+    def save(self, documents, hashes, vectors, index, ids):
+        # Write to temp files first so a power cut mid-save never leaves a half-written cache
+        meta = {"model": self.model_name, "hashes": hashes, "ids": [int(i) for i in ids], "documents": documents}
+        tmp_meta = self._path(META_FILE + ".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        tmp_vectors = self._path("embeddings.tmp.npy")
+        np.save(tmp_vectors, vectors)
+        tmp_index = self._path(INDEX_FILE + ".tmp")
+        import faiss
+        faiss.write_index(index, tmp_index)
+
+        os.replace(tmp_vectors, self._path(VECTORS_FILE))
+        os.replace(tmp_index, self._path(INDEX_FILE))
+        os.replace(tmp_meta, self._path(META_FILE))
+
+    def build(self, documents, encode):
+        """
+        Returns (index, ids, vectors) for `documents`, reusing cached vectors where the hash matches.
+        The index is ID-mapped (so single documents can be removed later); `ids[i]` belongs to documents[i].
+        `encode` is only called for documents that were added or changed.
+        """
+        hashes = [doc_hash(d) for d in documents]
+        meta, old_vectors = self.load()
+        old_hashes = meta.get("hashes", [])
+
+        # 1. Nothing changed -> load the saved index as-is
+        if hashes == old_hashes and "ids" in meta and os.path.exists(self._path(INDEX_FILE)):
+            try:
+                import faiss
+                index = faiss.read_index(self._path(INDEX_FILE))
+                if index.ntotal == len(hashes) and not needs_rebuild(index, len(hashes)):
+                    print(f"♻️ Index cache hit: {len(hashes)} documents, nothing to encode.")
+                    return tune(index), meta["ids"], old_vectors
+            except Exception: pass
+
+        # 2. Reuse whatever vectors we already have, encode the rest
+        cached = {h: old_vectors[i] for i, h in enumerate(old_hashes)} if old_vectors is not None else {}
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+        print(f"♻️ Reusing {len(hashes) - len(missing)} cached embeddings, encoding {len(missing)} new/changed documents...")
+
+        if missing:
+            new_vectors = encode([documents[i] for i in missing])
+            for i, vec in zip(missing, new_vectors):
+                cached[hashes[i]] = vec
+
+        vectors = np.stack([cached[h] for h in hashes]).astype('float32')
+        ids = np.arange(len(hashes), dtype='int64')
+        index = build_index(vectors, ids)
+
+        try:
+            self.save(documents, hashes, vectors, index, ids)
+        except Exception as e:
+            print(f"⚠️ Could not save index cache: {e}")
+        return index, ids.tolist(), vectors
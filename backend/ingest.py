@@ -0,0 +1,140 @@
+# backend/ingest.py
+# Turns faqs.json and everything in data/ into small overlapping chunks for the RAG index.
+
+import os
+import re
+import json
+from pypdf import PdfReader
+
+CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "600"))       # max characters per chunk
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "100"))  # characters repeated between neighbours
+if not 0 <= CHUNK_OVERLAP < CHUNK_SIZE:
+    # overlap >= size would never shorten a long line when hard-splitting it (endless loop at startup)
+    raise ValueError(f"RAG_CHUNK_OVERLAP ({CHUNK_OVERLAP}) must be >= 0 and smaller than RAG_CHUNK_SIZE ({CHUNK_SIZE})")
+PDF_OCR = os.getenv("RAG_PDF_OCR", "1") == "1"  # OCR PDF pages without a text layer (scanned calendars, notices)
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+
+
+def chunk_text(text, size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """
+    Splits text into chunks of at most `size` chars.
+    Breaks on line/sentence boundaries where possible, and repeats the last lines
+    (up to `overlap` chars) in the next chunk so an answer sitting on a boundary isn't lost.
+    """
+    if not 0 <= overlap < size: raise ValueError(f"chunk overlap ({overlap}) must be smaller than chunk size ({size})")
+    text = re.sub(r'[ \t]+', ' ', text).strip()
+    if not text: return []
+    if len(text) <= size: return [text]
+
+    # Lines first, long lines by sentence, anything still too long gets hard-split
+    pieces = []
+    for line in text.splitlines():
+        parts = re.split(r'(?<=[.!?])\s+(?=[A-Z])', line) if len(line) > size else [line]
+        for part in parts:
+            part = part.strip()
+            while len(part) > size:
+                pieces.append(part[:size])
+                part = part[size - overlap:]
+            if part: pieces.append(part)
+
+    chunks = []
+    current = []
+    for piece in pieces:
+        if current and len("\n".join(current + [piece])) > size:
+            chunks.append("\n".join(current))
+            # Carry whole trailing lines (up to `overlap` chars) into the next chunk
+            carry = []
+            while current and len("\n".join([current[-1]] + carry)) <= overlap:
+                carry.insert(0, current.pop())
+            current = carry if len("\n".join(carry + [piece])) <= size else []
+        current.append(piece)
+    if current: chunks.append("\n".join(current))
+    return chunks
+
+
+# ==========================================
+# SOURCES (each yields: source, page, text)
+# ==========================================
+
+def read_faqs(json_file):
+    if not os.path.exists(json_file): return
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not read {json_file}: {e}")
+        return
+    for item in data:
+        yield "FAQ", None, f"Q: {item['question']} A: {item['answer']}"
+
+
+def ocr_pages(path, page_numbers):
+    """{page_no: text} for image-only pages, OCR'd in parallel on the shared OCR pool."""
+    filename = os.path.basename(path)
+    try:
+        from ocr_engine import get_pool, ocr_page, OCR_DPI  # pytesseract + pdf2image are optional
+    except ImportError as e:
+        print(f"⚠️ {filename}: OCR not available ({e})")
+        return {}
+    with open(path, "rb") as f:
+        pdf_bytes = f.read()
+    print(f"🔍 {filename}: OCR for {len(page_numbers)} page(s) without a text layer...")
+    futures = {p: get_pool().submit(ocr_page, pdf_bytes, p, OCR_DPI) for p in page_numbers}
+    texts = {}
+    for page_no, future in futures.items():
+        try:
+            texts[page_no] = future.result()
+        except Exception as e:
+            print(f"⚠️ {filename}: OCR failed on page {page_no}: {e}")
+    return texts
+
+
+def read_file(path):
+    filename = os.path.basename(path)
+    if filename.lower().endswith(".txt"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield filename, None, f.read()
+    elif filename.lower().endswith(".pdf"):
+        reader = PdfReader(path)
+        texts = {page_no: page.extract_text() or "" for page_no, page in enumerate(reader.pages, start=1)}
+        # Scanned PDFs (e.g. the academic calendar) have pages that are just an image
+        blank = [p for p, text in texts.items() if not text.strip()]
+        if blank and PDF_OCR: texts.update(ocr_pages(path, blank))
+        missing = [p for p in blank if not texts[p].strip()]
+        if missing:
+            print(f"⚠️ {filename}: no text on page(s) {missing} (image-only, not OCR'd) - left out of the index")
+        for page_no, text in texts.items():
+            if text.strip(): yield filename, page_no, text
+
+
+def read_data_dir(data_dir):
+    if not os.path.exists(data_dir): return
+    for filename in sorted(os.listdir(data_dir)):
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS): continue
+        try:
+            yield from read_file(os.path.join(data_dir, filename))
+        except Exception as e:
+            print(f"⚠️ Skipping {filename}: {e}")
+
+
+# ==========================================
+# PIPELINE
+# ==========================================
+
+def format_chunk(chunk):
+    """Text that actually gets embedded and pasted into the prompt."""
+    label = chunk["source"] if chunk["page"] is None else f"{chunk['source']}, page {chunk['page']}"
+    return f"[Source: {label}] {chunk['text']}"
+
+
+def chunk_records(records):
+    for source, page, text in records:
+        for i, piece in enumerate(chunk_text(text)):
+            yield {"source": source, "page": page, "chunk": i, "text": piece}
+
+
+def iter_chunks(json_file, data_dir):
+    """Streams every chunk of the knowledge base: FAQs first, then data/ files."""
+    yield from chunk_records(read_faqs(json_file))
+    yield from chunk_records(read_data_dir(data_dir))
@@ -0,0 +1,77 @@
+# backend/intent_classifier.py
+# Embedding-based fallback router: when no keyword matched, compare the query vector with a few
+# example questions per mode. Uses the RAG encoder, and the same query vector is reused for retrieval.
+
+import os
+import numpy as np
+
+MIN_SCORE = float(os.getenv("INTENT_MIN_SCORE", "0.5"))  # cosine similarity needed to leave RAG mode
+
+PROTOTYPES = {
+    "map": [
+        "where is the library",
+        "how do I reach the admin block",
+        "show me the way to the canteen",
+        "directions to the engineering college",
+    ],
+    "bus": [
+        "which bus goes to my area",
+        "college bus timings and stops",
+        "who drives the college bus",
+        "transport facility for students",
+    ],
+    "hostel": [
+        "hostel fees and facilities",
+        "warden contact number",
+        "mess food timings",
+        "rooms available for students to stay",
+    ],
+    "notice": [
+        "latest notice from the university",
+        "exam schedule announcement",
+        "any new circular released",
+        "last date to fill the exam form",
+    ],
+    "governance": [
+        "who is the vice chancellor",
+        "registrar of the university",
+        "head of department contact",
+        "list of directors",
+    ],
+    "rag": [
+        "how do I apply for my degree",
+        "what is the fee for revaluation",
+        "university helpline contact details",
+        "when does the semester start",
+    ],
+}
+
+
+def normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype='float32')
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+class IntentClassifier:
+    def __init__(self, encode, prototypes=PROTOTYPES, min_score=MIN_SCORE):
+        self.encode = encode
+        self.min_score = min_score
+        self.modes = []
+        self.examples = []
+        for mode, sentences in prototypes.items():
+            self.modes += [mode] * len(sentences)
+            self.examples += sentences
+        self.matrix = None
+
+    def prepare(self):
+        # Prototypes are encoded once, during model warm-up (or on the first classify)
+        if self.matrix is None: self.matrix = normalize_rows(self.encode(self.examples))
+
+    def classify(self, query_vector):
+        """Returns (mode, score) for an already-encoded query. Low confidence -> ('rag', score)."""
+        self.prepare()
+        scores = self.matrix @ normalize_rows(query_vector).reshape(-1)
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.min_score: return "rag", score
+        return self.modes[best], score
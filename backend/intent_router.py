@@ -0,0 +1,145 @@
+# backend/intent_router.py
+# Single-pass keyword router for chat(): every keyword table compiled into one Aho-Corasick automaton.
+# One scan over the query returns every matched intent with its span, however many keywords we add.
+
+import re
+from collections import deque, namedtuple
+
+Rule = namedtuple("Rule", "intent value keywords priority boundary")
+Rule.__new__.__defaults__ = (None, (), 0, "word")
+
+Match = namedtuple("Match", "intent value keyword start end priority")
+
+
+class KeywordAutomaton:
+    """Aho-Corasick over characters. `search` yields (start, end, payload) for every (overlapping) hit."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add(self, keyword, payload):
+        node = 0
+        for ch in keyword:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[node][ch] = nxt
+            node = nxt
+        self.out[node].append((len(keyword), payload))
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]: f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def search(self, text):
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]: node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, payload in self.out[node]:
+                yield i - length + 1, i + 1, payload
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _boundary_ok(text, start, end, boundary):
+    if boundary == "none": return True
+    if start > 0 and _is_word_char(text[start - 1]): return False
+    # 'word' still accepts simple plurals: notice -> notices, bus -> buses
+    for suffix in ("", "s", "es"):
+        stop = end + len(suffix)
+        if text[end:stop] == suffix and (stop == len(text) or not _is_word_char(text[stop])): return True
+    return False
+
+
+class RouteResult:
+    def __init__(self, text, matches):
+        self.text = text
+        self.matches = matches
+
+    def has(self, intent):
+        return any(m.intent == intent for m in self.matches)
+
+    def all(self, intent):
+        return [m for m in self.matches if m.intent == intent]
+
+    def best(self, intent):
+        """Highest priority match for `intent`; ties go to the longer keyword, then the earlier one."""
+        found = self.all(intent)
+        if not found: return None
+        return max(found, key=lambda m: (m.priority, m.end - m.start, -m.start))
+
+    def intents(self):
+        return {m.intent for m in self.matches}
+
+
+class IntentRouter:
+    def __init__(self, rules):
+        self.automaton = KeywordAutomaton()
+        for rule in rules:
+            for keyword in rule.keywords:
+                self.automaton.add(normalize(keyword), rule)
+        self.automaton.build()
+
+    def route(self, text):
+        text = normalize(text)
+        matches = []
+        for start, end, rule in self.automaton.search(text):
+            if _boundary_ok(text, start, end, rule.boundary):
+                matches.append(Match(rule.intent, rule.value, text[start:end], start, end, rule.priority))
+        return RouteResult(text, matches)
+
+
+def normalize(text):
+    return re.sub(r'\s+', ' ', text.lower()).strip()
+
+
+# ==========================================
+# CAMPUS KEYWORD TABLES
+# ==========================================
+
+MODE_KEYWORDS = {
+    "map": ["where is", "route to", "location of", "way to", "go to", "map"],
+    "bus": ["bus", "driver", "transport", "gaadi", "route"],
+    "hostel": ["hostel", "warden", "fees", "mess", "room", "accommodation"],
+    "notice": ["notice", "news", "circular", "update", "date", "form", "schedule"],
+    "governance": ["chancellor", "vc", "registrar", "director", "dean", "hod"],
+}
+
+# Map targets: more specific places get a higher priority ('girls hostel' beats 'hostel')
+PLACE_KEYWORDS = [
+    ("library", ["library", "books", "reading room"], 10),
+    ("uit", ["uit", "engineering", "college block"], 10),
+    ("admin", ["admin", "administrative", "registrar office"], 10),
+    ("canteen", ["canteen", "food", "cafeteria"], 10),
+    ("bus stop", ["bus stop", "bus stand"], 20),
+    ("hostel", ["hostel", "boys hostel", "accommodation"], 10),
+    ("girls hostel", ["girls hostel", "ladies hostel"], 20),
+]
+
+
+def build_campus_router(smart_links):
+    rules = []
+    # Smart links keep the old dict order as priority (first listed wins)
+    for rank, key in enumerate(smart_links):
+        rules.append(Rule("link", key, [key], priority=len(smart_links) - rank))
+    for mode, keywords in MODE_KEYWORDS.items():
+        rules.append(Rule(mode, mode, keywords))
+    for place, keywords, priority in PLACE_KEYWORDS:
+        rules.append(Rule("place", place, keywords, priority))
+    return IntentRouter(rules)
@@ -0,0 +1,57 @@
+# backend/kb_watcher.py
+# Optional background watcher: picks up edits to faqs.json and data/ without restarting uvicorn.
+# Plain mtime polling, so it works the same on Windows kiosks and Linux servers without extra packages.
+
+import os
+import threading
+
+from ingest import SUPPORTED_EXTENSIONS
+
+
+class KnowledgeWatcher:
+    def __init__(self, engine, data_dir, json_file, interval=10):
+        self.engine = engine
+        self.data_dir = data_dir
+        self.json_file = json_file
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._seen = self.snapshot()
+
+    def snapshot(self):
+        """filename -> (mtime, size) for everything the engine ingests."""
+        files = {}
+        if os.path.exists(self.json_file):
+            st = os.stat(self.json_file)
+            files[os.path.basename(self.json_file)] = (st.st_mtime, st.st_size)
+        if os.path.exists(self.data_dir):
+            for filename in os.listdir(self.data_dir):
+                if not filename.lower().endswith(SUPPORTED_EXTENSIONS): continue
+                try:
+                    st = os.stat(os.path.join(self.data_dir, filename))
+                    files[filename] = (st.st_mtime, st.st_size)
+                except OSError: pass
+        return files
+
+    def poll(self):
+        current = self.snapshot()
+        changed = [f for f, sig in current.items() if self._seen.get(f) != sig]
+        removed = [f for f in self._seen if f not in current]
+        self._seen = current
+        for filename in changed + removed:
+            try:
+                self.engine.sync_file(filename)
+            except Exception as e:
+                print(f"⚠️ Watcher could not sync '{filename}': {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        print(f"👀 Watching {self.data_dir} for knowledge updates (every {self.interval}s)...")
+        self._thread = threading.Thread(target=self._run, name="kb-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
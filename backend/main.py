@@ -1,31 +1,67 @@
 import os
 import uuid
 import json
-import requests
-import subprocess
 import time
+import secrets
 import asyncio
+import threading
 import numpy as np
-import pypdf
-import faiss
-from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Optional
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-import edge_tts 
 import re 
-from rgpv_scraper import perform_web_search, get_live_notices, extract_text_from_pdf, scrape_official_profile
+from index_store import IndexStore, build_index, remove_ids, needs_rebuild, doc_hash
+from hybrid_search import BM25Index, fuse, CANDIDATES as RETRIEVE_CANDIDATES
+from ingest import iter_chunks, format_chunk, chunk_records, read_faqs, read_file, SUPPORTED_EXTENSIONS
+from kb_watcher import KnowledgeWatcher
+from intent_router import build_campus_router
+from intent_classifier import IntentClassifier
+from encoders import load_encoder, EMBED_MODEL, EMBED_BACKEND
+from session_store import SessionStore
+from faq_matcher import FAQMatcher, ENABLED as FAQ_DIRECT_ENABLED
+from response_cache import ResponseCache, SEMANTIC as RESPONSE_CACHE_SEMANTIC
+from context_packer import pack_context, budget_for, count_tokens, pick_num_ctx
+from metrics import span, observe, request_trace, register_callback, render as render_metrics
+from notice_store import NoticeStore, REFRESH_INTERVAL as NOTICE_REFRESH_INTERVAL
+from governance_store import GovernanceSnapshotStore, SNAPSHOT_DIR as GOV_SNAPSHOT_DIR, CRAWL_INTERVAL as GOV_CRAWL_INTERVAL
+from http_client import ollama_client, close_all as close_http_clients, request as http_request
+from tts_cache import TTSCache
+from tts_pipeline import TTSWorkerPool, TTSBusy, render_clip, split_sentences
+from rgpv_scraper import perform_web_search, extract_text_from_pdf, DIRECT_URLS
 
 # IMPORTS FOR BUS & HOSTEL
-from bus_data import search_bus
-from hostel_data import search_hostel
-
-app = FastAPI()
-
-CHAT_HISTORY = []
+from bus_data import search_bus, bus_index
+from hostel_data import search_hostel, hostel_index
+
+@asynccontextmanager
+async def lifespan(app):
+    # Optional: pick up edits to faqs.json / data/ without a restart (KB_WATCH=1)
+    watcher = None
+    if os.getenv("KB_WATCH", "0") == "1":
+        watcher = KnowledgeWatcher(rag_engine, DATA_DIR, JSON_FILE, int(os.getenv("KB_WATCH_INTERVAL", "10")))
+    # Model + index load in the background; the watcher and FAQ audio need the model, so they wait for it
+    model_task = asyncio.create_task(start_model_services(watcher))
+    # Keep the notice board warm so notice questions are answered from memory
+    notice_task = asyncio.create_task(notice_store.run()) if NOTICE_REFRESH_INTERVAL > 0 else None
+    # Pre-crawl governance pages into the offline snapshot
+    crawl_task = asyncio.create_task(governance_store.run()) if GOV_CRAWL_INTERVAL > 0 else None
+    yield
+    model_task.cancel()
+    if notice_task: notice_task.cancel()
+    if crawl_task: crawl_task.cancel()
+    if watcher: watcher.stop()
+    await close_http_clients()
+
+app = FastAPI(lifespan=lifespan)
+
+# Conversation memory per kiosk/browser session (bounded ring buffers, idle sessions expire)
+sessions = SessionStore()
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "300"))
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,71 +72,264 @@ app.add_middleware(
 )
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-AUDIO_DIR = os.path.join(BASE_DIR, "audio")
+AUDIO_DIR = os.getenv("KIOSK_AUDIO_DIR", os.path.join(BASE_DIR, "audio"))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 JSON_FILE = os.path.join(BASE_DIR, "faqs.json")
+INDEX_DIR = os.path.join(BASE_DIR, "index_cache")
+CACHE_DIR = os.getenv("KIOSK_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
 
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(DATA_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 app.mount("/audio", StaticFiles(directory=AUDIO_DIR), name="audio")
 VOICE_ID = "en-IN-NeerjaNeural" 
+TTS_CACHE_DIR = os.path.join(AUDIO_DIR, "cache")
+tts_pool = TTSWorkerPool(int(os.getenv("TTS_MAX_WORKERS", "2")), int(os.getenv("TTS_MAX_QUEUE", "4")))
+tts_cache = TTSCache(TTS_CACHE_DIR, int(os.getenv("TTS_CACHE_MAX_MB", "500")) * 1024 * 1024)
+
+notice_store = NoticeStore(os.path.join(CACHE_DIR, "notices.json"))
+governance_store = GovernanceSnapshotStore(GOV_SNAPSHOT_DIR)
 
 class RAGEngine:
     def __init__(self):
         print("🧠 Initializing Smart Campus AI Brain...") # Generic Print
-        self.documents = []
+        # Everything below is keyed by the FAISS id of a chunk
+        self.documents = {}  # id -> formatted chunk text
+        self.chunks = {}     # id -> metadata (source, page, chunk no)
+        self.vectors = {}    # id -> embedding (reused when a source is re-ingested)
+        self.sources = {}    # source name -> [ids]
+        self.next_id = 0
+        self.version = 0     # bumped on every live update (invalidates cached answers)
         self.model = None
         self.index = None
-        self.load_json()
-        self.load_documents()
-        if self.documents:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            embeddings = self.model.encode(self.documents, convert_to_numpy=True).astype('float32')
-            d = embeddings.shape[1] 
-            self.index = faiss.IndexFlatL2(d) 
-            self.index.add(embeddings)
-    def load_json(self):
-        if os.path.exists(JSON_FILE):
+        self.bm25 = BM25Index()  # lexical side of retrieve(), same ids as the FAISS index
+        self.store = IndexStore(INDEX_DIR, EMBED_MODEL)  # renamed to the encoder's name once it loads
+        # `lock` guards the index + maps for readers; `write_lock` serializes updaters
+        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        # Model + index are loaded by warm_up() in the background, so the server (and the
+        # map / bus / hostel / link answers) are up before torch has even been imported
+        self.model_lock = threading.Lock()
+        self.warmup_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.status = {"stage": "pending", "progress": 0.0, "chunks": 0, "error": None, "started_at": None, "seconds": None}
+    def load_model(self):
+        with self.model_lock:
+            if self.model is None:
+                self.model = load_encoder()  # EMBED_BACKEND: torch (sentence-transformers) or onnx (int8)
+                self.store.model_name = self.model.name
+        return self.model
+    def encode(self, texts):
+        return self.load_model().encode(texts)
+    def warm_up(self, after=()):
+        """
+        Imports + loads the embedding model, then builds the index. Blocking, run it in a thread.
+        `after` are extra (stage, fn) steps (prototype / FAQ encoding) run before `ready` is set.
+        Safe to call more than once; a failed warm-up is retried by the next caller.
+        """
+        with self.warmup_lock:
+            if self.ready.is_set(): return True
+            started = time.time()
+            steps = [("loading_model", self.load_model), ("loading_index", self.load_chunks), *after]
+            self.status.update(started_at=started, error=None)
             try:
-                with open(JSON_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    for item in data:
-                        self.documents.append(f"[Source: FAQ] Q: {item['question']} A: {item['answer']}")
-            except: pass
-    def load_documents(self):
-        if not os.path.exists(DATA_DIR): return
-        for filename in os.listdir(DATA_DIR):
-            path = os.path.join(DATA_DIR, filename)
-            if filename.endswith(".txt"):
-                try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        text = f.read()
-                        if text.strip(): self.documents.append(text)
-                except: pass
-    def retrieve(self, query: str, k: int = 3) -> List[str]:
-        if not self.index or not query: return []
-        query_embedding = self.model.encode(query, convert_to_numpy=True).astype('float32').reshape(1, -1)
-        D, I = self.index.search(query_embedding, k)
-        return [self.documents[i] for i in I[0] if i < len(self.documents)]
+                for n, (stage, fn) in enumerate(steps):
+                    self.status.update(stage=stage, progress=round(n / len(steps), 2))
+                    with span(f"warmup_{stage}"): fn()
+            except Exception as e:
+                print(f"❌ Warm-up failed during {self.status['stage']}: {e}")
+                self.status.update(stage="failed", error=str(e))
+                return False
+            self.status.update(stage="ready", progress=1.0, chunks=len(self.documents), seconds=round(time.time() - started, 2))
+            self.ready.set()
+            print(f"✅ Knowledge base ready in {self.status['seconds']}s")
+            return True
+    def load_chunks(self):
+        # FAQs + data/ (txt & pdf) all go through the same chunking pipeline
+        chunks = list(iter_chunks(JSON_FILE, DATA_DIR))
+        print(f"📚 Loaded {len(chunks)} knowledge chunks.")
+        # Built into fresh maps and swapped in whole, so a warm-up retried after a failed step
+        # (FAQ / prototype encoding) rebuilds the index instead of appending every chunk twice
+        documents, metadata, vectors_by_id, sources, bm25 = {}, {}, {}, {}, BM25Index()
+        index, ids = None, []
+        if chunks:
+            texts = [format_chunk(c) for c in chunks]
+            index, ids, vectors = self.store.build(texts, self.encode)
+            for i, chunk, text, vec in zip(ids, chunks, texts, vectors):
+                documents[i] = text
+                metadata[i] = chunk
+                vectors_by_id[i] = vec
+                sources.setdefault(chunk["source"], []).append(i)
+                bm25.add(i, text)
+        with self.lock:
+            self.index, self.documents, self.chunks, self.vectors = index, documents, metadata, vectors_by_id
+            self.sources, self.bm25 = sources, bm25
+            self.next_id = max(ids) + 1 if ids else 0
+
+    # --- LIVE UPDATES ---
+    def upsert_source(self, source, records):
+        """Replaces every chunk of `source` with chunks built from `records` (source, page, text)."""
+        with self.write_lock:
+            chunks = list(chunk_records(records))
+            texts = [format_chunk(c) for c in chunks]
+
+            # Chunks whose text didn't change keep their old vector; only the rest hit the model
+            with self.lock:
+                known = {doc_hash(self.documents[i]): self.vectors[i] for i in self.sources.get(source, [])}
+            missing = [t for t in texts if doc_hash(t) not in known]
+            if missing: known.update(zip((doc_hash(t) for t in missing), self.encode(missing)))
+            vectors = np.array([known[doc_hash(t)] for t in texts], dtype='float32')
+
+            with self.lock:
+                self._remove_ids(self.sources.pop(source, []))
+                if chunks:
+                    ids = list(range(self.next_id, self.next_id + len(chunks)))
+                    self.next_id += len(chunks)
+                    if self.index is None: self.index = build_index(vectors, ids)
+                    else: self.index.add_with_ids(vectors, np.array(ids, dtype='int64'))
+                    for i, chunk, text, vec in zip(ids, chunks, texts, vectors):
+                        self.documents[i] = text
+                        self.chunks[i] = chunk
+                        self.vectors[i] = vec
+                        self.bm25.add(i, text)
+                    self.sources[source] = ids
+                self.version += 1
+            print(f"🔄 Knowledge updated: '{source}' -> {len(chunks)} chunks ({len(missing)} encoded).")
+            self.rebuild_if_needed()
+            self.persist()
+            return len(chunks)
+    def remove_source(self, source):
+        with self.write_lock:
+            with self.lock:
+                ids = self.sources.pop(source, [])
+                self._remove_ids(ids)
+                if ids: self.version += 1
+            if ids:
+                print(f"🗑️ Knowledge removed: '{source}' ({len(ids)} chunks).")
+                self.rebuild_if_needed()
+                self.persist()
+            return len(ids)
+    def _remove_ids(self, ids):
+        if not ids: return
+        remove_ids(self.index, ids)
+        for i in ids:
+            if i in self.documents: self.bm25.remove(i, self.documents[i])
+            self.documents.pop(i, None)
+            self.chunks.pop(i, None)
+            self.vectors.pop(i, None)
+    def rebuild_if_needed(self):
+        """Past ANN_MIN_CHUNKS (or after many HNSW deletions) rebuild from the stored vectors; no re-encoding."""
+        with self.lock:
+            if self.index is None or not self.documents or not needs_rebuild(self.index, len(self.documents)): return
+            ids = list(self.documents.keys())
+            vectors = np.array([self.vectors[i] for i in ids], dtype='float32')
+        # Built outside the lock: questions keep using the old index meanwhile (callers hold write_lock)
+        index = build_index(vectors, ids)
+        with self.lock: self.index = index
+    def sync_file(self, filename):
+        """Re-ingests data/<filename>, or drops it from the index if the file is gone."""
+        if filename == os.path.basename(JSON_FILE):
+            return self.upsert_source("FAQ", read_faqs(JSON_FILE))
+        path = os.path.join(DATA_DIR, filename)
+        if os.path.exists(path): return self.upsert_source(filename, read_file(path))
+        return self.remove_source(filename)
+    def persist(self):
+        # Keep the on-disk cache in step so the next boot doesn't re-encode live updates
+        with self.lock:
+            if self.index is None: return
+            ids = list(self.documents.keys())
+            documents = [self.documents[i] for i in ids]
+            vectors = np.array([self.vectors[i] for i in ids], dtype='float32').reshape(len(ids), -1)
+            import faiss
+            index = faiss.clone_index(self.index)
+        try:
+            self.store.save(documents, [doc_hash(d) for d in documents], vectors, index, ids)
+        except Exception as e:
+            print(f"⚠️ Could not save index cache: {e}")
+    def list_sources(self):
+        with self.lock:
+            return {source: len(ids) for source, ids in self.sources.items()}
+
+    def embed_query(self, query: str):
+        return self.encode([query]).reshape(1, -1)
+    def retrieve(self, query: str, k: int = 3, query_vector=None) -> List[str]:
+        """
+        Hybrid search: vector + BM25 candidates, blended, cut off by RETRIEVE_MIN_SCORE and diversified
+        with MMR - so it can return fewer than `k` chunks (or none) when nothing is relevant.
+        `query_vector` lets callers that already encoded the query (intent classifier) skip a second pass.
+        """
+        if self.index is None or not query: return []
+        query_embedding = query_vector if query_vector is not None else self.embed_query(query)
+        with self.lock:
+            if not self.documents: return []
+            # HNSW keeps deleted chunks until the next rebuild; fetch past them
+            fetch = min(self.index.ntotal, max(k, RETRIEVE_CANDIDATES) + self.index.ntotal - len(self.documents))
+            with span("vector_search"):
+                D, I = self.index.search(query_embedding, fetch)
+            dense = [int(i) for i in I[0] if i in self.documents]
+            with span("bm25_search"):
+                lexical = self.bm25.search(query)
+            hits = fuse(query_embedding, dense, lexical, self.vectors, k)
+            return [self.documents[i] for i, score in hits]
 
 rag_engine = RAGEngine()
+intent_classifier = IntentClassifier(rag_engine.encode)
+faq_matcher = FAQMatcher(rag_engine.encode, JSON_FILE)
+
+# --- WARM-UP ---
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") == "1"    # 0 = load the model on the first knowledge question
+RAG_WAIT_TIMEOUT = float(os.getenv("RAG_WAIT_TIMEOUT", "20"))  # how long a knowledge question waits for warm-up
+WARMING_UP_REPLY = "I'm still getting ready. Please ask me again in a few seconds, or ask me about maps, buses or hostels meanwhile."
+INSTANT_MODES = ["link", "map", "bus", "hostel"]  # answered from keyword routing + local data, no model needed
+
+warmup_task = None  # the one warm-up in flight; every waiting request shares it
+
+def start_warm_up():
+    """Returns the running warm-up task, starting one if none has been started or the last one failed."""
+    global warmup_task
+    if warmup_task is None or (warmup_task.done() and not rag_engine.ready.is_set()):
+        # Prototype + FAQ question vectors are encoded here too, so the first question pays for nothing
+        after = [("intent_prototypes", intent_classifier.prepare), ("faq_questions", faq_matcher.refresh)]
+        warmup_task = asyncio.create_task(asyncio.to_thread(rag_engine.warm_up, after))
+    return warmup_task
+
+async def rag_ready():
+    """True once model + index are loaded. Waits up to RAG_WAIT_TIMEOUT, starting the warm-up if nobody has."""
+    if rag_engine.ready.is_set(): return True
+    try:
+        # shield: a timed-out request stops waiting, the shared warm-up keeps going (and holds no extra thread)
+        return await asyncio.wait_for(asyncio.shield(start_warm_up()), RAG_WAIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        return False
+
+def warming_up_response():
+    return {"reply": WARMING_UP_REPLY, "mode": "warming_up", "action_url": None, "map_target": None}
+
+async def start_model_services(watcher):
+    if WARMUP_ON_START: await start_warm_up()
+    while not rag_engine.ready.is_set(): await asyncio.sleep(1)
+    if watcher: watcher.start()
+    # Optional: render FAQ answers into the TTS cache so direct answers also speak instantly
+    if os.getenv("FAQ_PRERENDER_TTS", "0") == "1": await prerender_faq_audio()
 
 class ChatRequest(BaseModel):
     text: str
+    session_id: Optional[str] = None
 
 class TTSRequest(BaseModel):
     text: str
 
-def get_executable_path(filename, subfolder=None):
-    if subfolder:
-        local_path = os.path.join(BASE_DIR, subfolder, filename)
-        if os.path.exists(local_path): return local_path
-    root_path = os.path.join(BASE_DIR, filename)
-    if os.path.exists(root_path): return root_path
-    return filename
+class KnowledgeDoc(BaseModel):
+    name: str
+    text: str
+
+class FAQItem(BaseModel):
+    question: str
+    answer: str
 
 def cleanup_old_files():
+    # Finished clips live in the TTS cache (LRU by size); only half-finished temp files get swept here
     try:
         current_time = time.time()
         for filename in os.listdir(AUDIO_DIR):
@@ -110,38 +339,228 @@ def cleanup_old_files():
                 os.remove(file_path)
     except Exception as e: pass
 
+def cached_audio_urls(key):
+    return {
+        "audio_url": f"http://localhost:8000/audio/cache/{key}.mp3",
+        "json_url": f"http://localhost:8000/audio/cache/{key}.json"
+    }
+
+def speakable(text):
+    # Links are shown on screen, not read out
+    return re.sub(r'\(?https?://\S+\)?', '', text)
+
 @app.post("/tts-eleven")
 async def tts_handler(req: TTSRequest):
-    cleanup_old_files()
-    file_id = str(uuid.uuid4())
-    mp3_filename = f"{file_id}.mp3"
-    mp3_filepath = os.path.join(AUDIO_DIR, mp3_filename)
-    
-    try:
-        clean_text = re.sub(r'\(?https?://\S+\)?', '', req.text)
-        communicate = edge_tts.Communicate(clean_text, VOICE_ID)
-        await communicate.save(mp3_filepath)
-        
-        wav_filepath = os.path.join(AUDIO_DIR, f"{file_id}.wav")
+    with request_trace("tts") as trace:
+        clean_text = speakable(req.text)
+        cache_key = tts_cache.key(clean_text, VOICE_ID)
+        if tts_cache.lookup(cache_key):
+            print("⚡ TTS cache hit")
+            trace["source"] = "cache"
+            return cached_audio_urls(cache_key)
+
+        cleanup_old_files()
+        file_id = str(uuid.uuid4())
+        mp3_filepath = os.path.join(AUDIO_DIR, f"{file_id}.mp3")
         json_filepath = os.path.join(AUDIO_DIR, f"{file_id}.json")
-        
-        ffmpeg_cmd = get_executable_path("ffmpeg.exe")
-        rhubarb_cmd = get_executable_path("rhubarb.exe", "rhubarb")
-
-        subprocess.run([ffmpeg_cmd, "-y", "-i", mp3_filepath, "-ac", "1", "-ar", "16000", wav_filepath], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        subprocess.run([rhubarb_cmd, "-f", "json", "-o", json_filepath, wav_filepath], capture_output=True)
 
-        return {
-            "audio_url": f"http://localhost:8000/audio/{mp3_filename}",
-            "json_url": f"http://localhost:8000/audio/{f'{file_id}.json'}"
-        }
-    except Exception as e:
-        return {"error": str(e)}
+        trace["source"] = "rendered"
+        try:
+            with tts_pool.slot():
+                ok = await render_clip(tts_pool, clean_text, VOICE_ID, mp3_filepath, json_filepath)
+            if not ok:
+                trace["source"] = "error"
+                return {"error": "Lip sync generation failed."}
+            tts_cache.store(cache_key, mp3_filepath, json_filepath)
+            return cached_audio_urls(cache_key)
+        except TTSBusy:
+            print("🚦 TTS busy, rejecting request")
+            trace["source"] = "busy"
+            return JSONResponse(status_code=503, content={"error": "busy"}, headers={"Retry-After": "2"})
+        except Exception as e:
+            trace["source"] = "error"
+            return {"error": str(e)}
+
+async def render_segment(text):
+    """Cached-or-rendered clip for one sentence. Returns (cache key, rhubarb json) or None on failure."""
+    key = tts_cache.key(text, VOICE_ID)
+    if not tts_cache.lookup(key):
+        file_id = str(uuid.uuid4())
+        mp3_filepath = os.path.join(AUDIO_DIR, f"{file_id}.mp3")
+        json_filepath = os.path.join(AUDIO_DIR, f"{file_id}.json")
+        try:
+            # One pool slot per rendered segment, so a long reply counts against TTS_MAX_QUEUE like N requests
+            with tts_pool.slot():
+                if not await render_clip(tts_pool, text, VOICE_ID, mp3_filepath, json_filepath): return None
+        except TTSBusy:
+            print("🚦 TTS busy, skipping segment")
+            return None
+        except Exception as e:
+            print(f"⚠️ TTS segment failed: {e}")
+            return None
+        tts_cache.store(key, mp3_filepath, json_filepath)
+    with open(tts_cache.paths(key)[1], "r", encoding="utf-8") as f:
+        return key, json.load(f)
+
+async def prerender_faq_audio():
+    """Fills the TTS cache with every FAQ answer, sentence by sentence (same segments as /tts-stream)."""
+    answers = await asyncio.to_thread(faq_matcher.answers)
+    rendered = 0
+    for answer in answers:
+        for segment in split_sentences(speakable(answer)):
+            if await render_segment(segment): rendered += 1
+    print(f"🔊 Pre-rendered {rendered} FAQ audio segments")
+
+@app.post("/tts-stream")
+async def tts_stream_handler(req: TTSRequest):
+    """
+    Sentence-level streaming TTS. Up to TTS_MAX_WORKERS sentences render at once, each holding its own
+    pool slot, and are emitted in order as NDJSON lines with audio url, mouth cues and offset in the reply.
+    """
+    clean_text = speakable(req.text)
+    segments = split_sentences(clean_text)
+    if tts_pool.full():
+        return JSONResponse(status_code=503, content={"error": "busy"}, headers={"Retry-After": "2"})
+
+    async def stream():
+        with request_trace("tts-stream", source="rendered") as trace:
+            started = time.perf_counter()
+            in_flight = asyncio.Semaphore(tts_pool.max_workers)
+
+            async def bounded(sentence):
+                async with in_flight:
+                    return await render_segment(sentence)
+
+            # Segments still waiting on the semaphore are cancelled before they start any work
+            tasks = [asyncio.create_task(bounded(s)) for s in segments]
+            offset = 0.0
+            try:
+                for i, (sentence, task) in enumerate(zip(segments, tasks)):
+                    result = await task
+                    if not result:
+                        yield json.dumps({"index": i, "text": sentence, "error": "segment failed"}) + "\n"
+                        continue
+                    key, lipsync = result
+                    if i == 0: observe("tts_first_segment", time.perf_counter() - started)
+                    duration = lipsync.get("metadata", {}).get("duration", 0)
+                    yield json.dumps({
+                        "index": i, "text": sentence, **cached_audio_urls(key),
+                        "offset": round(offset, 3), "duration": duration,
+                        "mouthCues": lipsync.get("mouthCues", [])
+                    }) + "\n"
+                    offset += duration
+            finally:
+                for task in tasks: task.cancel()
+            yield json.dumps({"done": True, "segments": len(segments), "duration": round(offset, 3)}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @app.get("/")
 def root():
     return {"status": "Smart Campus AI Backend Running"}
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once knowledge questions can be answered, 503 (with progress) while warming up."""
+    status = dict(rag_engine.status)
+    if status["started_at"] and status["seconds"] is None: status["elapsed"] = round(time.time() - status["started_at"], 2)
+    body = {"ready": rag_engine.ready.is_set(), **status, "encoder": EMBED_BACKEND, "instant_modes": INSTANT_MODES}
+    return JSONResponse(status_code=200 if body["ready"] else 503, content=body)
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus text format: stage/request histograms plus cache and TTS pool numbers."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# ==========================================
+# ADMIN: LIVE KNOWLEDGE UPDATES
+# ==========================================
+# ADMIN_TOKEN must be set for any /admin route to work; clients send it as the X-Admin-Token header.
+# Unset means admin is disabled (503), never open - CORS is '*' and the kiosk sits on a shared network.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+FAQ_LOCK = threading.Lock()
+
+def check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin API disabled: set ADMIN_TOKEN to enable it")
+    if not token or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def require_index():
+    # Live updates during the initial build would race load_chunks(); the file edit can wait a few seconds
+    if not rag_engine.ready.is_set():
+        raise HTTPException(status_code=503, detail="Knowledge base is still loading", headers={"Retry-After": "5"})
+
+def safe_doc_name(name, extensions=(".txt",)):
+    filename = os.path.basename(name.strip())
+    if not filename or filename.startswith("."): raise HTTPException(status_code=400, detail="Invalid document name")
+    if not filename.lower().endswith(extensions): filename += ".txt"
+    return filename
+
+@app.get("/admin/documents")
+def admin_list_documents(x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    return {"sources": rag_engine.list_sources()}
+
+@app.post("/admin/documents")
+def admin_upsert_document(doc: KnowledgeDoc, x_admin_token: str = Header(None)):
+    """Adds or replaces a text notice in data/ and re-indexes just that file."""
+    check_admin(x_admin_token)
+    require_index()
+    filename = safe_doc_name(doc.name)
+    with open(os.path.join(DATA_DIR, filename), "w", encoding="utf-8") as f:
+        f.write(doc.text)
+    return {"source": filename, "chunks": rag_engine.sync_file(filename)}
+
+@app.delete("/admin/documents/{name}")
+def admin_delete_document(name: str, x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    require_index()
+    # Same rules as POST, so 'evil' deletes the 'evil.txt' it created (PDFs in data/ can be removed too)
+    filename = safe_doc_name(name, SUPPORTED_EXTENSIONS)
+    path = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(path) and filename not in rag_engine.list_sources():
+        raise HTTPException(status_code=404, detail=f"Unknown document '{filename}'")
+    if os.path.exists(path): os.remove(path)
+    return {"source": filename, "removed_chunks": rag_engine.remove_source(filename)}
+
+@app.post("/admin/faqs")
+def admin_add_faq(item: FAQItem, x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    require_index()
+    with FAQ_LOCK:
+        data = []
+        if os.path.exists(JSON_FILE):
+            with open(JSON_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        data.append({"question": item.question, "answer": item.answer})
+        with open(JSON_FILE + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(JSON_FILE + ".tmp", JSON_FILE)
+    return {"faqs": len(data), "chunks": rag_engine.sync_file(os.path.basename(JSON_FILE))}
+
+@app.post("/admin/reload")
+def admin_reload(x_admin_token: str = Header(None)):
+    """Re-syncs every file in data/ plus faqs.json (only changed chunks are re-encoded)."""
+    check_admin(x_admin_token)
+    require_index()
+    names = set(rag_engine.list_sources()) - {"FAQ"}
+    if os.path.exists(DATA_DIR): names |= {f for f in os.listdir(DATA_DIR) if f.lower().endswith(SUPPORTED_EXTENSIONS)}
+    for filename in sorted(names): rag_engine.sync_file(filename)
+    rag_engine.sync_file(os.path.basename(JSON_FILE))
+    return {"sources": rag_engine.list_sources()}
+
+@app.get("/admin/cache")
+def admin_cache_stats(x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    return response_cache.stats()
+
+@app.delete("/admin/cache")
+def admin_cache_clear(x_admin_token: str = Header(None)):
+    check_admin(x_admin_token)
+    response_cache.clear()
+    return response_cache.stats()
+
 SMART_LINKS = {
     "login": "https://rgpv.ac.in/Login/StudentLogin.aspx",
     "portal": "https://rgpv.ac.in/Login/StudentLogin.aspx",
@@ -151,39 +570,51 @@ SMART_LINKS = {
     "calendar": "https://www.rgpv.ac.in/Academics/frm_AcademicCalender.aspx"
 }
 
-@app.post("/chat")
-def chat(req: ChatRequest):
-    global CHAT_HISTORY
-    if len(CHAT_HISTORY) > 4: CHAT_HISTORY = CHAT_HISTORY[-4:]
-        
+intent_router = build_campus_router(SMART_LINKS)
+
+async def prepare_chat(req: ChatRequest, query_vector=None):
+    """
+    Routing + context gathering + prompt building, shared by /chat and /chat-stream.
+    `query_vector` is passed when the response cache already encoded the query.
+    Returns {"reply", "action_url"} for instant answers (smart links), otherwise the prompt and metadata.
+    """
     print(f"\n🗣️ USER: '{req.text}'")
     query_lower = req.text.lower()
     
     system_data = ""
+    context_pieces = None  # ranked pieces (RAG hits); otherwise system_data is one piece
     action_url = None
     map_target = None 
 
+    # One pass over the query finds every link / mode / place keyword (word-boundary aware)
+    with span("route"):
+        routed = intent_router.route(query_lower)
+
     # 1. Smart Links
-    for key, url in SMART_LINKS.items():
-        if key in query_lower: return {"reply": "Opening link...", "action_url": url}
-
-    # 2. Location Map (Includes Bus & Hostels)
-    locations_map = {
-        "library": ["library", "books", "reading room"],
-        "uit": ["uit", "engineering", "college block"],
-        "admin": ["admin", "administrative", "registrar office"],
-        "canteen": ["canteen", "food", "cafeteria"],
-        "bus stop": ["bus stop", "bus stand"],
-        "hostel": ["hostel", "boys hostel", "accommodation"], 
-        "girls hostel": ["girls hostel", "ladies hostel"]
-    }
+    link = routed.best("link")
+    if link: return {"reply": "Opening link...", "action_url": SMART_LINKS[link.value], "map_target": None}
 
     # Flags
-    is_map_query = any(x in query_lower for x in ["where is", "route to", "location of", "way to", "go to", "map"])
-    is_bus_query = any(x in query_lower for x in ["bus", "driver", "transport", "gaadi", "route"]) 
-    is_hostel_query = any(x in query_lower for x in ["hostel", "warden", "fees", "mess", "room", "accommodation"])
-    is_notice_query = any(x in query_lower for x in ["notice", "news", "circular", "update", "date", "form", "schedule"])
-    is_governance_query = any(x in query_lower for x in ["chancellor", "vc", "registrar", "director", "dean", "hod"])
+    is_map_query = routed.has("map")
+    is_bus_query = routed.has("bus")
+    is_hostel_query = routed.has("hostel")
+    is_notice_query = routed.has("notice")
+    is_governance_query = routed.has("governance")
+
+    # No keyword hit -> embedding classifier decides; the same query vector is reused by RAG below
+    if not (is_map_query or is_bus_query or is_hostel_query or is_notice_query or is_governance_query):
+        if not await rag_ready(): return warming_up_response()
+        if query_vector is None:
+            with span("embed_query"):
+                query_vector = await asyncio.to_thread(rag_engine.embed_query, req.text)
+        with span("intent_classify"):
+            predicted, score = intent_classifier.classify(query_vector)
+        print(f"🧭 Intent (embedding): {predicted} ({score:.2f})")
+        if predicted == "map": is_map_query = routed.has("place")  # no place, no map to show
+        elif predicted == "bus": is_bus_query = True
+        elif predicted == "hostel": is_hostel_query = True
+        elif predicted == "notice": is_notice_query = True
+        elif predicted == "governance": is_governance_query = True
 
     mode = "general"
 
@@ -193,11 +624,11 @@ def chat(req: ChatRequest):
     if is_map_query:
         print("⚡ Mode: Navigation / Map")
         mode = "map"
-        for key, keywords in locations_map.items():
-            if any(k in query_lower for k in keywords):
-                map_target = key
-                system_data = f"User is asking for directions to {key.upper()}. I am opening the map on the screen."
-                break
+        # 2. Location Map (Includes Bus & Hostels) - most specific place wins
+        place = routed.best("place")
+        if place:
+            map_target = place.value
+            system_data = f"User is asking for directions to {map_target.upper()}. I am opening the map on the screen."
         
         if not map_target:
             if "bus" in query_lower: mode = "bus_fallback"
@@ -207,7 +638,8 @@ def chat(req: ChatRequest):
     if is_bus_query and (mode != "map" or mode == "bus_fallback"):
         print("⚡ Mode: Bus Transport Info")
         mode = "bus"
-        found_buses = search_bus(query_lower)
+        with span("bus_lookup"):
+            found_buses = search_bus(query_lower)
         if found_buses:
             system_data = "FOUND BUS DETAILS:\n"
             for b in found_buses:
@@ -222,7 +654,8 @@ def chat(req: ChatRequest):
         print("⚡ Mode: Hostel Info")
         mode = "hostel"
         
-        search_result = search_hostel(query_lower)
+        with span("hostel_lookup"):
+            search_result = search_hostel(query_lower)
         found_hostels = search_result["hostels"]
         extra_info = search_result["extra_info"]
         
@@ -258,12 +691,14 @@ def chat(req: ChatRequest):
         if "exam" in query_lower: search_keyword = "exam"
         if "result" in query_lower: search_keyword = "result"
 
-        notices = get_live_notices(search_keyword)
+        with span("notice_search"):
+            notices = await notice_store.search(search_keyword)
         if notices:
             top = notices[0]
             print(f"📄 Reading PDF for Notice: {top['title']}")
-            pdf_text = extract_text_from_pdf(top['url'])
-            system_data = f"LATEST NOTICE:\nTitle: {top['title']}\nDate: {top['date']}\nLink: {top['url']}\nCONTENT:\n{pdf_text[:3000]}"
+            with span("pdf_text"):
+                pdf_text = await extract_text_from_pdf(top['url'])
+            system_data = f"LATEST NOTICE:\nTitle: {top['title']}\nDate: {top['date']}\nLink: {top['url']}\nCONTENT:\n{pdf_text}"
             action_url = top['url']
         else:
             system_data = f"No recent notices found for '{search_keyword}'."
@@ -272,15 +707,34 @@ def chat(req: ChatRequest):
     elif is_governance_query:
         print("⚡ Mode: Governance Scraping")
         mode = "official"
+        # Longest role name first, so 'vice chancellor' wins over 'chancellor'
         role_asked = "official"
-        system_data = scrape_official_profile(role_asked)
+        for role in sorted(DIRECT_URLS, key=len, reverse=True):
+            if re.search(rf"\b{re.escape(role)}\b", query_lower):
+                role_asked = role
+                break
+        with span("governance_profile"):
+            system_data = await governance_store.official_profile(role_asked)
 
     # F. GENERIC/RAG 📚
     elif mode == "general":
+        if not await rag_ready(): return warming_up_response()
+        if query_vector is None:
+            with span("embed_query"):
+                query_vector = await asyncio.to_thread(rag_engine.embed_query, req.text)
+        # Near-paraphrase of a FAQ question -> stored answer, no retrieval or LLM call
+        if FAQ_DIRECT_ENABLED:
+            with span("faq_match"):
+                faq, score = await asyncio.to_thread(faq_matcher.match, query_vector)
+            if faq:
+                print(f"⚡ Mode: FAQ direct answer ({score:.2f}): {faq['question']}")
+                return {"reply": faq["answer"], "mode": "faq", "action_url": None, "map_target": None}
         print("📚 Mode: Local Knowledge Base")
         mode = "rag"
-        docs = rag_engine.retrieve(req.text)
-        system_data = "\n".join(docs)
+        # Encoding + FAISS search is CPU work, keep it off the event loop
+        with span("retrieve"):
+            docs = await asyncio.to_thread(rag_engine.retrieve, req.text, 3, query_vector)
+        context_pieces = docs
 
     # --- PROMPT SETTING (GENERIC) ---
     base_instructions = ""
@@ -295,14 +749,23 @@ def chat(req: ChatRequest):
     else:
         base_instructions = "Answer concisely. Enclose links in brackets."
 
+    # Trim CONTEXT DATA to the mode's token budget (deduped, boilerplate dropped, best lines first)
+    with span("pack_context"):
+        system_data, packing = pack_context(context_pieces or [system_data], req.text, budget_for(mode),
+                                            dedupe=mode not in ("bus", "hostel"))
+
     # 👇 UPDATED GENERIC PROMPT
+    # Recent turns from this session only (follow-up questions), newest first until the budget runs out
+    history = sessions.prompt_history(req.session_id, req.text, HISTORY_TOKEN_BUDGET)
+    history_block = f"RECENT CONVERSATION:\n    {history}\n    \n    " if history else ""
+
     prompt = f"""You are a Smart Campus AI Assistant designed for Universities.
     Be helpful, professional, and concise.
     
     CONTEXT DATA (Use this to answer):
     {system_data}
     
-    USER QUESTION: {req.text}
+    {history_block}USER QUESTION: {req.text}
     
     INSTRUCTIONS:
     {base_instructions}
@@ -315,13 +778,152 @@ def chat(req: ChatRequest):
     Reply in English.
     """
 
-    try:
-        ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-        res = requests.post(f"{ollama_host}/api/generate", json={
-            "model": "llama3", "prompt": prompt, "stream": False, "options": {"num_ctx": 4096}
-        })
-        reply = res.json().get("response", "").strip()
-        CHAT_HISTORY.append({"user": req.text, "ai": reply})
-        return {"reply": reply, "action_url": action_url, "map_target": map_target}
-    except Exception as e:
-        return {"reply": "Error connecting to brain.", "action_url": None}
\ No newline at end of file
+    packing["prompt_tokens"] = count_tokens(prompt)
+    packing["num_ctx"] = pick_num_ctx(packing["prompt_tokens"])
+    print(f"📦 Context: {packing['context_tokens']}/{packing['budget']} tokens (raw {packing['raw_tokens']}), num_ctx={packing['num_ctx']}")
+
+    return {"prompt": prompt, "mode": mode, "action_url": action_url, "map_target": map_target, "context": packing}
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+
+def ollama_options(ctx):
+    return {"num_ctx": ctx["context"]["num_ctx"]}
+
+def remember_turn(req, reply):
+    sessions.add_turn(req.session_id, req.text, reply)
+
+# --- RESPONSE CACHE ---
+def data_version(mode):
+    if mode == "bus": return bus_index.version()
+    if mode == "hostel": return hostel_index.version()
+    if mode == "rag": return rag_engine.version
+    if mode == "faq": return faq_matcher.version()
+    return None
+
+response_cache = ResponseCache(data_version)
+
+register_callback("kiosk_response_cache_lookups_total", "Response cache lookups by result", "counter", lambda: [
+    ({"result": name}, response_cache.stats()[name]) for name in ("hits", "semantic_hits", "misses", "expired")
+])
+register_callback("kiosk_response_cache_entries", "Answers held in the response cache", "gauge",
+                  lambda: [({}, response_cache.stats()["entries"])])
+register_callback("kiosk_tts_pending", "TTS jobs running or waiting", "gauge", lambda: [({}, tts_pool.pending)])
+
+def route_signature(text):
+    # Same keyword route = same kind of answer; keeps 'where is the library' apart from 'where is the canteen'
+    return tuple(sorted({(m.intent, m.value) for m in intent_router.route(text.lower()).matches}))
+
+async def cache_lookup(req):
+    """
+    Returns (cached response or None, lookup state). Only questions whose prompt gets no history use
+    the cache: a follow-up like 'and its fees?' means something different in every conversation.
+    """
+    cacheable = not sessions.prompt_history(req.session_id, req.text, HISTORY_TOKEN_BUDGET)
+    state = {"cacheable": cacheable, "signature": route_signature(req.text), "query_vector": None}
+    if not state["cacheable"]: return None, state
+    with span("cache_lookup"):
+        hit = response_cache.get(req.text, state["signature"])
+    # Semantic lookup needs the model; until warm-up is done only exact hits are served
+    if hit is None and RESPONSE_CACHE_SEMANTIC and rag_engine.ready.is_set():
+        with span("embed_query"):
+            state["query_vector"] = await asyncio.to_thread(rag_engine.embed_query, req.text)
+        with span("cache_lookup_semantic"):
+            hit = response_cache.get_similar(state["signature"], state["query_vector"])
+    if hit is None:
+        response_cache.miss()
+        return None, state
+    print("⚡ Response cache hit")
+    remember_turn(req, hit["reply"])
+    return {**hit, "cached": True}, state
+
+def cache_store(req, state, mode, response):
+    if state["cacheable"]:
+        response_cache.put(req.text, state["signature"], mode, response, state["query_vector"])
+
+@app.post("/chat")
+async def chat(req: ChatRequest):
+    with request_trace("chat") as trace:
+        cached, cache_state = await cache_lookup(req)
+        if cached:
+            trace.update(mode=cached.get("mode"), source="cache")
+            return cached
+        ctx = await prepare_chat(req, cache_state["query_vector"])
+        trace["mode"] = ctx.get("mode", "link")
+        if "reply" in ctx:
+            trace["source"] = trace["mode"]  # smart link / FAQ direct answer
+            remember_turn(req, ctx["reply"])
+            if ctx.get("mode") == "faq": cache_store(req, cache_state, "faq", ctx)
+            return ctx
+
+        trace["source"] = "llm"
+        try:
+            with span("llm_generate"):
+                res = await http_request(ollama_client(), "POST", f"{OLLAMA_HOST}/api/generate", json={
+                    "model": "llama3", "prompt": ctx["prompt"], "stream": False, "options": ollama_options(ctx)
+                })
+            reply = res.json().get("response", "").strip()
+            remember_turn(req, reply)
+            response = {"reply": reply, "action_url": ctx["action_url"], "map_target": ctx["map_target"], "context": ctx["context"]}
+            if reply: cache_store(req, cache_state, ctx["mode"], {**response, "mode": ctx["mode"]})
+            return response
+        except Exception as e:
+            trace["source"] = "error"
+            return {"reply": "Error connecting to brain.", "action_url": None}
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat-stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Same as /chat, but streams llama3 tokens as server-sent events:
+    `meta` (action_url / map_target, known before generation) -> `token`* -> `done` (full reply).
+    """
+    async def events():
+        # The trace lives inside the generator so the LLM span (streamed after we return) is part of it
+        with request_trace("chat-stream") as trace:
+            cached, cache_state = await cache_lookup(req)
+            ctx = cached or await prepare_chat(req, cache_state["query_vector"])
+            trace["mode"] = ctx.get("mode", "link")
+            yield sse("meta", {"mode": ctx.get("mode"), "action_url": ctx["action_url"], "map_target": ctx["map_target"], "context": ctx.get("context")})
+            if "reply" in ctx:
+                trace["source"] = "cache" if cached else trace["mode"]
+                if not cached:
+                    remember_turn(req, ctx["reply"])  # cache hits were recorded by cache_lookup
+                    if ctx.get("mode") == "faq": cache_store(req, cache_state, "faq", ctx)
+                yield sse("token", {"text": ctx["reply"]})
+                yield sse("done", {"reply": ctx["reply"]})
+                return
+
+            trace["source"] = "llm"
+            reply = ""
+            try:
+                with span("llm_generate"):
+                    started = time.perf_counter()
+                    async with ollama_client().stream("POST", f"{OLLAMA_HOST}/api/generate", json={
+                        "model": "llama3", "prompt": ctx["prompt"], "stream": True, "options": ollama_options(ctx)
+                    }) as res:
+                        # Ollama streams one JSON object per line
+                        async for line in res.aiter_lines():
+                            if not line: continue
+                            part = json.loads(line)
+                            token = part.get("response", "")
+                            if token:
+                                if not reply: observe("llm_first_token", time.perf_counter() - started)
+                                reply += token
+                                yield sse("token", {"text": token})
+                            if part.get("done"): break
+            except Exception as e:
+                trace["source"] = "error"
+                yield sse("error", {"reply": "Error connecting to brain."})
+                return
+            reply = reply.strip()
+            remember_turn(req, reply)
+            if reply:
+                cache_store(req, cache_state, ctx["mode"], {
+                    "reply": reply, "mode": ctx["mode"], "action_url": ctx["action_url"],
+                    "map_target": ctx["map_target"], "context": ctx["context"]
+                })
+            yield sse("done", {"reply": reply})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,150 @@
+# backend/metrics.py
+# Lightweight tracing: `span("stage")` times a block into a Prometheus histogram, and (inside
+# `request_trace`) also into a per-request list that can be written to a JSON-lines timing log.
+# No dependency on prometheus_client; `render()` produces the text exposition format for /metrics.
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TIMING_LOG = os.getenv("TIMING_LOG")  # optional path: one JSON line per request with every span
+# Seconds; covers 1 ms routing up to minute-long CPU llama3 generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_registry = []
+_callbacks = []
+_trace = ContextVar("trace", default=None)
+_log_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=None):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: parts.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_label_text(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self.lock:
+            series = self.series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound: series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, ('le', bound))} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, ('le', '+Inf'))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+def register_callback(name, help_text, kind, collect):
+    """Numbers kept elsewhere (e.g. response cache counters). collect() -> [(labels dict, value)]."""
+    _callbacks.append((name, help_text, kind, collect))
+
+
+def render():
+    lines = []
+    for metric in _registry: lines += metric.render()
+    for name, help_text, kind, collect in _callbacks:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for labels, value in collect():
+            lines.append(f"{name}{_label_text(list(labels), list(labels.values()))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ==========================================
+# KIOSK METRICS
+# ==========================================
+
+STAGE_SECONDS = Histogram("kiosk_stage_seconds", "Time spent per pipeline stage", ["stage"])
+STAGE_ERRORS = Counter("kiosk_stage_errors_total", "Stages that raised", ["stage"])
+REQUEST_SECONDS = Histogram("kiosk_request_seconds", "End-to-end request time", ["endpoint", "mode", "source"])
+REQUESTS = Counter("kiosk_requests_total", "Requests by endpoint, mode and answer source", ["endpoint", "mode", "source"])
+
+
+def observe(stage, seconds):
+    """Records a duration measured by hand (e.g. time to first token inside a longer span)."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    trace = _trace.get()
+    if trace is not None: trace["spans"].append({"stage": stage, "ms": round(seconds * 1000, 2)})
+
+
+@contextmanager
+def span(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+@contextmanager
+def request_trace(endpoint, **fields):
+    """
+    Wraps one request. The yielded dict can be filled in on the way (mode, source); on exit the
+    request histogram/counter are updated and, with TIMING_LOG set, one JSON line is appended.
+    """
+    trace = {"endpoint": endpoint, "mode": None, "source": None, "spans": [], **fields}
+    token = _trace.set(trace)
+    started = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        try: _trace.reset(token)
+        except ValueError: pass  # streaming response closed from another context (client went away)
+        elapsed = time.perf_counter() - started
+        labels = {"endpoint": endpoint, "mode": trace["mode"] or "none", "source": trace["source"] or "none"}
+        REQUEST_SECONDS.observe(elapsed, **labels)
+        REQUESTS.inc(**labels)
+        if TIMING_LOG:
+            trace.update(ts=time.strftime("%Y-%m-%dT%H:%M:%S"), total_ms=round(elapsed * 1000, 2))
+            try:
+                with _log_lock, open(TIMING_LOG, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"⚠️ Could not write timing log: {e}")
@@ -0,0 +1,105 @@
+# backend/notice_store.py
+# In-memory notice board, refreshed in the background, so notice questions don't wait on rgpv.ac.in.
+
+import os
+import re
+import json
+import time
+import asyncio
+
+from rgpv_scraper import fetch_all_notices
+
+REFRESH_INTERVAL = int(os.getenv("NOTICE_REFRESH_INTERVAL", "600"))  # seconds between background scrapes
+MAX_STALENESS = int(os.getenv("NOTICE_MAX_STALENESS", "3600"))        # older than this -> scrape inline first
+RETRY_AFTER_FAILURE = 60  # don't make every request wait on a site that just timed out
+
+
+def tokenize(text):
+    return re.findall(r'\w+', text.lower())
+
+
+class NoticeStore:
+    """
+    Last good snapshot of both notice pages, plus a token -> notice positions index for keyword lookup.
+    If a refresh fails (site down / timeout) the previous snapshot keeps being served.
+    The snapshot is also saved to disk so a kiosk that boots offline still has notices.
+    """
+
+    def __init__(self, snapshot_file):
+        self.snapshot_file = snapshot_file
+        self.notices = []
+        self.postings = {}
+        self.fetched_at = 0
+        self.last_attempt = 0
+        self._lock = asyncio.Lock()
+        self.load()
+
+    def _set(self, notices, fetched_at):
+        postings = {}
+        for pos, notice in enumerate(notices):
+            for token in set(tokenize(notice["title"])):
+                postings.setdefault(token, []).append(pos)
+        # Swap in one go; readers see either the old or the new snapshot
+        self.notices, self.postings, self.fetched_at = notices, postings, fetched_at
+
+    def load(self):
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._set(data["notices"], data["fetched_at"])
+            print(f"📰 Loaded {len(self.notices)} notices from last snapshot.")
+        except Exception: pass
+
+    def save(self):
+        try:
+            tmp = self.snapshot_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": self.fetched_at, "notices": self.notices}, f, ensure_ascii=False)
+            os.replace(tmp, self.snapshot_file)
+        except Exception as e:
+            print(f"⚠️ Could not save notice snapshot: {e}")
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    async def refresh(self, unless_attempted_since=None):
+        """Scrapes both notice pages. With `unless_attempted_since`, skips (returns None) if another
+        refresh - successful or not - started after that time while we waited for the lock."""
+        async with self._lock:
+            if unless_attempted_since is not None and self.last_attempt > unless_attempted_since: return None
+            self.last_attempt = time.time()
+            notices = await fetch_all_notices()
+            if notices is None:
+                print(f"⚠️ Notice refresh failed, serving snapshot from {int(self.age())}s ago.")
+                return False
+            self._set(notices, time.time())
+            self.save()
+            print(f"📰 Notice board refreshed: {len(notices)} notices.")
+            return True
+
+    async def search(self, keyword=None, limit=5):
+        stale = not self.notices or self.age() > MAX_STALENESS
+        if stale and time.time() - self.last_attempt > RETRY_AFTER_FAILURE:
+            # Another request may already be refreshing; the lock makes us wait for that one and reuse its
+            # outcome, so a site outage costs one scrape per RETRY_AFTER_FAILURE, not one per queued request
+            await self.refresh(unless_attempted_since=self.last_attempt)
+
+        if not keyword: return self.notices[:limit]
+        keyword = keyword.lower()
+        if not re.fullmatch(r'\w+', keyword):
+            return [n for n in self.notices if keyword in n["title"].lower()][:limit]
+
+        # Substring match over the vocabulary (so 'exam' still finds 'examination'), not over every title
+        matched = set()
+        for token, positions in self.postings.items():
+            if keyword in token: matched.update(positions)
+        return [self.notices[p] for p in sorted(matched)[:limit]]
+
+    async def run(self, interval=REFRESH_INTERVAL):
+        """Background loop: refresh now, then every `interval` seconds."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ Notice refresher error: {e}")
+            await asyncio.sleep(interval)
@@ -0,0 +1,66 @@
+# backend/ocr_engine.py
+# Parallel OCR for scanned notices: every page is rasterized + OCR'd in its own worker process.
+# Kept free of app imports on purpose - worker processes import this module (spawn on Windows).
+
+import os
+import atexit
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pytesseract
+from pdf2image import convert_from_bytes
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))  # page budget per PDF
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+
+_pool = None
+
+
+def _init_worker(tesseract_cmd):
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def ocr_page(pdf_bytes, page_no, dpi):
+    """Runs inside a worker: rasterize one page and OCR it."""
+    # Poppler Path Optional (Agar Environment Variable set hai)
+    images = convert_from_bytes(pdf_bytes, dpi=dpi, first_page=page_no, last_page=page_no, poppler_path=None)
+    return "\n".join(pytesseract.image_to_string(img) for img in images)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_worker,
+                                    initargs=(pytesseract.pytesseract.tesseract_cmd,))
+        atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def iter_ocr_pages(pdf_bytes, page_count, max_pages=OCR_MAX_PAGES, dpi=OCR_DPI):
+    """Yields (page_no, text) as soon as each page finishes - not necessarily in page order."""
+    pages = range(1, min(page_count, max_pages) + 1)
+    futures = {get_pool().submit(ocr_page, pdf_bytes, p, dpi): p for p in pages}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Caller stopped early (enough text) or a page failed -> don't waste CPU on the rest
+        for future in futures: future.cancel()
+
+
+def ocr_pdf(pdf_bytes, page_count, char_limit=None, max_pages=OCR_MAX_PAGES, dpi=OCR_DPI):
+    """
+    OCR text of the first `max_pages` pages, in page order.
+    Stops early once the leading pages already cover `char_limit` characters.
+    """
+    done = {}
+    next_page = 1
+    text = ""
+    for page_no, page_text in iter_ocr_pages(pdf_bytes, page_count, max_pages, dpi):
+        done[page_no] = page_text
+        # Append every page that is now contiguous from the start
+        while next_page in done:
+            text += done.pop(next_page) + "\n"
+            next_page += 1
+        if char_limit and len(text) >= char_limit: break
+    return text
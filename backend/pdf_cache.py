@@ -0,0 +1,85 @@
+# backend/pdf_cache.py
+# On-disk cache of extracted notice PDF text (pypdf or OCR), revalidated with ETag / Last-Modified.
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class PDFTextCache:
+    """
+    One small JSON file per PDF url: {url, etag, last_modified, content_hash, text, ocr, checked_at}.
+    Entries are evicted least-recently-used first (file mtime) once the folder grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes, fresh_for):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for  # seconds an entry is trusted without asking the server again
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, f"{url_key(url)}.json")
+
+    def get(self, url):
+        path = self._path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry if entry.get("url") == url else None
+        except Exception:
+            return None
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("checked_at", 0) < self.fresh_for
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, **fields):
+        entry = {"url": url, "checked_at": time.time(), **fields}
+        path = self._path(url)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self.evict()
+        return entry
+
+    def touch(self, url, entry, **fields):
+        """Server confirmed our copy is still current: just refresh the validators/timestamp."""
+        # A 304 may omit ETag / Last-Modified; keep the validators we already had instead of erasing them
+        entry.update({k: v for k, v in fields.items() if v is not None})
+        return self.put(url, **{k: v for k, v in entry.items() if k not in ("url", "checked_at")})
+
+    def evict(self):
+        with self._lock:
+            files = []
+            for filename in os.listdir(self.cache_dir):
+                if not filename.endswith(".json"): continue
+                path = os.path.join(self.cache_dir, filename)
+                try: st = os.stat(path)
+                except OSError: continue
+                files.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes: break
+                try: os.remove(path)
+                except OSError: pass
+                total -= size
@@ -0,0 +1,115 @@
+# backend/response_cache.py
+# Answers for repeated questions ("where is the library", "mess timings") without routing, scraping,
+# retrieval or llama3. Keyed by the normalized query + its keyword route; optional paraphrase lookup.
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "1") == "1"
+SEMANTIC_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SEMANTIC_THRESHOLD", "0.92"))
+
+# Seconds an answer stays valid per mode (override with RESPONSE_CACHE_TTL_<MODE>=n, 0 disables).
+# None = no time limit: bus/hostel/rag/faq answers are dropped when their source data version changes.
+DEFAULT_TTLS = {"notice": 300, "official": 3600, "map": 86400, "bus": None, "hostel": None, "rag": None, "faq": None}
+DEFAULT_TTL = 3600
+
+
+def ttl_for(mode):
+    value = os.getenv(f"RESPONSE_CACHE_TTL_{mode.upper()}")
+    if value is not None: return int(value)
+    return DEFAULT_TTLS.get(mode, DEFAULT_TTL)
+
+
+def normalize_query(text):
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class ResponseCache:
+    """
+    LRU of {response, mode, version, expires, vector}. `version` is whatever the caller's data_version(mode)
+    returned when the answer was made (e.g. the bus file's mtime); a different value on lookup = stale.
+    """
+
+    def __init__(self, data_version, max_entries=MAX_ENTRIES, semantic_threshold=SEMANTIC_THRESHOLD):
+        self.data_version = data_version
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self._entries = OrderedDict()  # (normalized query, route signature) -> entry, oldest first
+        self._lock = threading.Lock()
+        self.hits = self.semantic_hits = self.misses = self.expired = 0
+
+    def _valid(self, entry, now):
+        if entry["expires"] is not None and now > entry["expires"]: return False
+        return entry["version"] == self.data_version(entry["mode"])
+
+    def get(self, query, signature):
+        key = (normalize_query(query), signature)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._valid(entry, now):
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["response"]
+            return None
+
+    def get_similar(self, signature, query_vector):
+        """Paraphrase lookup among entries with the same keyword route ('library' never answers 'canteen')."""
+        if query_vector is None: return None
+        query_vector = np.asarray(query_vector, dtype='float32').reshape(-1)
+        query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+        now = time.time()
+        with self._lock:
+            best_key, best_score = None, self.semantic_threshold
+            for key, entry in self._entries.items():
+                if key[1] != signature or entry["vector"] is None: continue
+                score = float(entry["vector"] @ query_vector)
+                if score >= best_score and self._valid(entry, now): best_key, best_score = key, score
+            if best_key is None: return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            return self._entries[best_key]["response"]
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, query, signature, mode, response, query_vector=None):
+        ttl = ttl_for(mode)
+        if ttl == 0: return
+        vector = None
+        if query_vector is not None:
+            vector = np.asarray(query_vector, dtype='float32').reshape(-1)
+            vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        entry = {
+            "response": response, "mode": mode, "version": self.data_version(mode),
+            "expires": time.time() + ttl if ttl else None, "vector": vector,
+        }
+        with self._lock:
+            key = (normalize_query(query), signature)
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "semantic_hits": self.semantic_hits, "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+            }
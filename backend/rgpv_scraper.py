@@ -1,5 +1,5 @@
-import requests
 import io
+import asyncio
 import os
 import re
 import urllib3
@@ -7,8 +7,11 @@ from pypdf import PdfReader
 from duckduckgo_search import DDGS
 from bs4 import BeautifulSoup
 import pytesseract
-from pdf2image import convert_from_bytes
 from PIL import Image
+from http_client import ScraperClient
+from pdf_cache import PDFTextCache, content_hash
+from ocr_engine import ocr_pdf, OCR_MAX_PAGES
+from metrics import span, Counter
 
 # SSL Warning Disable
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -24,6 +27,21 @@ if os.path.exists(PYTESSERACT_PATH):
 else:
     print(f"⚠️ Warning: Tesseract not found at {PYTESSERACT_PATH}. OCR might fail.")
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("KIOSK_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+
+# Extracted notice text (pypdf / OCR) keyed by URL, revalidated with ETag / Last-Modified
+pdf_cache = PDFTextCache(
+    os.path.join(CACHE_DIR, "pdf"),
+    max_bytes=int(os.getenv("PDF_CACHE_MAX_MB", "50")) * 1024 * 1024,
+    fresh_for=int(os.getenv("PDF_CACHE_FRESH_SECONDS", "3600")),
+)
+
+PDF_CACHE_RESULTS = Counter("kiosk_pdf_cache_total", "Notice PDF text lookups by cache outcome", ["result"])
+
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "10"))      # pypdf page budget
+PDF_TEXT_LIMIT = int(os.getenv("PDF_TEXT_LIMIT", "4000"))  # chars kept per notice
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
@@ -31,6 +49,14 @@ HEADERS = {
     "Connection": "keep-alive"
 }
 
+# One keep-alive client for the whole module: warm-up once, per-host limit, timeouts + retries
+scraper = ScraperClient(
+    "https://www.rgpv.ac.in/",
+    headers=HEADERS,
+    cookie_ttl=int(os.getenv("SCRAPER_COOKIE_TTL", "900")),
+    per_host=int(os.getenv("SCRAPER_PER_HOST", "4")),
+)
+
 # ==========================================
 # 2. GOVERNANCE MODULE (UNCHANGED)
 # ==========================================
@@ -49,31 +75,41 @@ DIRECT_URLS = {
     "anti-ragging": "https://www.rgpv.ac.in/AboutRGTU/AntiRagging.aspx"
 }
 
-def fetch_and_clean_page(url):
-    try:
-        session = requests.Session()
-        session.get("https://www.rgpv.ac.in/", headers=HEADERS, verify=False, timeout=10)
-        response = session.get(url, headers=HEADERS, verify=False, timeout=15)
-        
-        if response.status_code != 200: return None
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        if "can not found" in soup.get_text().lower() or "404" in soup.title.string if soup.title else False:
-            return None
+def clean_page(content):
+    soup = BeautifulSoup(content, "html.parser")
+    
+    if "can not found" in soup.get_text().lower() or "404" in soup.title.string if soup.title else False:
+        return None
+
+    for tag in soup(["script", "style", "header", "footer", "nav", "aside"]): tag.decompose()
+    for div in soup.find_all("div", class_=["menu", "navigation", "top-bar", "sidebar"]): div.decompose()
 
-        for tag in soup(["script", "style", "header", "footer", "nav", "aside"]): tag.decompose()
-        for div in soup.find_all("div", class_=["menu", "navigation", "top-bar", "sidebar"]): div.decompose()
+    main_content = soup.find(id="ctl00_ContentPlaceHolder1_pnlContents")
+    text = main_content.get_text() if main_content else soup.get_text()
+    
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return '\n'.join(chunk for chunk in chunks if chunk)[:4000]
 
-        main_content = soup.find(id="ctl00_ContentPlaceHolder1_pnlContents")
-        text = main_content.get_text() if main_content else soup.get_text()
+async def fetch_and_clean_page(url):
+    try:
+        # Cookie warm-up happens once per session inside the shared client, not per page
+        with span("scrape_page"):
+            response = await scraper.get(url)
         
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        return '\n'.join(chunk for chunk in chunks if chunk)[:4000]
+        if response.status_code != 200: return None
+        # BeautifulSoup parsing is CPU work, keep it off the event loop
+        with span("clean_page"):
+            return await asyncio.to_thread(clean_page, response.content)
     except Exception:
         return None
 
-def scrape_official_profile(role_name):
+def ddg_search(query, max_results):
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+async def find_official_page(role_name):
+    """(url, cleaned text) of the role's page - direct link first, then search - or (None, None)."""
     print(f"🏛️ Deep Scraping RGPV Website for: '{role_name}'...")
     final_text = None
     used_url = None
@@ -81,7 +117,7 @@ def scrape_official_profile(role_name):
     if role_name in DIRECT_URLS:
         url = DIRECT_URLS[role_name]
         print(f"🔗 Trying Direct Link: {url}")
-        final_text = fetch_and_clean_page(url)
+        final_text = await fetch_and_clean_page(url)
         if final_text:
             used_url = url
             print("✅ Direct Link worked!")
@@ -90,17 +126,22 @@ def scrape_official_profile(role_name):
         print("🌍 Searching Google/DDG...")
         query = f"site:rgpv.ac.in {role_name} profile"
         try:
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=3))
-                for res in results:
-                    test_url = res['href']
-                    final_text = fetch_and_clean_page(test_url)
-                    if final_text:
-                        used_url = test_url
-                        print("✅ Search Link worked!")
-                        break
+            with span("web_search"):
+                results = await asyncio.to_thread(ddg_search, query, 3)
+            for res in results:
+                test_url = res['href']
+                final_text = await fetch_and_clean_page(test_url)
+                if final_text:
+                    used_url = test_url
+                    print("✅ Search Link worked!")
+                    break
         except Exception: pass
 
+    if not final_text: return None, None
+    return used_url, final_text
+
+async def scrape_official_profile(role_name):
+    used_url, final_text = await find_official_page(role_name)
     if not final_text: return "Could not find the official page."
     return f"OFFICIAL SOURCE: {used_url}\nPAGE DATA:\n{final_text}"
 
@@ -109,154 +150,197 @@ def scrape_official_profile(role_name):
 # 3. NOTICE BOARD & OCR MODULE (DUAL SOURCE 🔥)
 # ==========================================
 
-def get_live_notices(keyword=None):
-    """
-    Combines notices from Homepage & Archive.
-    Ignores 'javascript:' links AND General Menu Links.
-    """
-    print(f"🕵️‍♂️ Scraping Notices (Keyword: {keyword})...")
-    
-    session = requests.Session()
-    notices = []
-    seen_urls = set()
+HOME_URL = "https://www.rgpv.ac.in/"
+ARCHIVE_URL = "https://www.rgpv.ac.in/Uni/ImpNoticeArchive.aspx"
 
-    # 🛑 BLACKLIST: In words wale links ko notice mat samjho
-    IGNORED_URLS = [
-        "aboutrgtu", "login", "gallery", "contact", "examination.aspx", 
-        "result.aspx", "download.aspx", "alumini", "placement", "scheme", 
-        "syllabus", "academic", "javascript", "dopostback", "#"
-    ]
+# 🛑 BLACKLIST: In words wale links ko notice mat samjho
+IGNORED_URLS = [
+    "aboutrgtu", "login", "gallery", "contact", "examination.aspx", 
+    "result.aspx", "download.aspx", "alumini", "placement", "scheme", 
+    "syllabus", "academic", "javascript", "dopostback", "#"
+]
 
-    # Helper function to validate link
-    def is_valid_notice(text, href):
-        href_lower = href.lower()
-        
-        # 1. Text Length Check (Chhote links menu items hote hain)
-        if len(text) < 15: return False 
-        
-        # 2. Blacklist Check
-        if any(bad in href_lower for bad in IGNORED_URLS): return False
+# Helper function to validate link
+def is_valid_notice(text, href):
+    href_lower = href.lower()
+    
+    # 1. Text Length Check (Chhote links menu items hote hain)
+    if len(text) < 15: return False 
+    
+    # 2. Blacklist Check
+    if any(bad in href_lower for bad in IGNORED_URLS): return False
+    
+    # 3. Valid Types Check
+    if ".pdf" in href_lower or "notice" in href_lower or "view" in href_lower or "click here" in text.lower():
+        return True
         
-        # 3. Valid Types Check
-        if ".pdf" in href_lower or "notice" in href_lower or "view" in href_lower or "click here" in text.lower():
-            return True
-            
-        return False
+    return False
 
-    # --- SOURCE 1: HOMEPAGE ---
-    try:
-        home_url = "https://www.rgpv.ac.in/"
-        resp_home = session.get(home_url, headers=HEADERS, verify=False, timeout=10)
-        soup_home = BeautifulSoup(resp_home.content, "html.parser")
+def parse_home_notices(content):
+    soup_home = BeautifulSoup(content, "html.parser")
+    notices = []
+    for link in soup_home.find_all('a', href=True):
+        text = link.text.strip()
+        href = link['href']
         
-        for link in soup_home.find_all('a', href=True):
-            text = link.text.strip()
-            href = link['href']
+        if is_valid_notice(text, href):
+            full_url = href if href.startswith('http') else f"https://www.rgpv.ac.in/{href}"
+            full_url = full_url.replace("//", "/").replace("https:/", "https://")
+            notices.append({"date": "Latest Alert", "title": text, "url": full_url})
+    return notices
+
+def parse_archive_notices(content):
+    soup_arch = BeautifulSoup(content, "html.parser")
+    notices = []
+    for row in soup_arch.find_all("tr"):
+        cols = row.find_all("td")
+        if len(cols) >= 2:
+            col1_text = cols[0].text.strip() # Date
+            col2 = cols[1] # Title + Link
             
-            if is_valid_notice(text, href):
-                full_url = href if href.startswith('http') else f"https://www.rgpv.ac.in/{href}"
-                full_url = full_url.replace("//", "/").replace("https:/", "https://")
+            if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', col1_text):
+                date = col1_text
+                title = col2.text.strip()
+                link_tag = col2.find("a")
                 
-                if full_url not in seen_urls:
-                    notice_obj = {"date": "Latest Alert", "title": text, "url": full_url}
-                    
-                    # Keyword Check (Strict)
-                    if keyword:
-                        # Sirf tab add karo agar keyword title mein ho
-                        if keyword.lower() in text.lower():
-                            notices.append(notice_obj)
-                            seen_urls.add(full_url)
-                    else:
-                        notices.append(notice_obj)
-                        seen_urls.add(full_url)
-    except Exception: pass
-
-    # --- SOURCE 2: ARCHIVE PAGE ---
+                if link_tag and 'href' in link_tag.attrs:
+                    link = link_tag['href']
+                    if is_valid_notice(title, link):
+                        if not link.startswith("http"): link = "https://www.rgpv.ac.in" + link
+                        notices.append({"date": date, "title": title, "url": link})
+    return notices
+
+async def fetch_notice_source(url, parser):
+    """Parsed notices from one page, or None if the page couldn't be fetched."""
     try:
-        archive_url = "https://www.rgpv.ac.in/Uni/ImpNoticeArchive.aspx"
-        resp_arch = session.get(archive_url, headers=HEADERS, verify=False, timeout=10)
-        soup_arch = BeautifulSoup(resp_arch.content, "html.parser")
-        
-        for row in soup_arch.find_all("tr"):
-            cols = row.find_all("td")
-            if len(cols) >= 2:
-                col1_text = cols[0].text.strip() # Date
-                col2 = cols[1] # Title + Link
-                
-                if re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}', col1_text):
-                    date = col1_text
-                    title = col2.text.strip()
-                    link_tag = col2.find("a")
-                    
-                    if link_tag and 'href' in link_tag.attrs:
-                        link = link_tag['href']
-                        if is_valid_notice(title, link):
-                            if not link.startswith("http"): link = "https://www.rgpv.ac.in" + link
-                            
-                            if link not in seen_urls:
-                                notice_obj = {"date": date, "title": title, "url": link}
-                                
-                                if keyword:
-                                    if keyword.lower() in title.lower():
-                                        notices.append(notice_obj)
-                                        seen_urls.add(link)
-                                else:
-                                    notices.append(notice_obj)
-                                    seen_urls.add(link)
-    except Exception: pass
+        with span("notice_page"):
+            response = await scraper.get(url)
+        if response.status_code != 200: return None
+        with span("parse_notices"):
+            return await asyncio.to_thread(parser, response.content)
+    except Exception:
+        return None
+
+async def fetch_all_notices():
+    """
+    Every notice from Homepage + Archive (homepage first), de-duplicated by URL.
+    Returns None if both pages failed, so callers can tell 'site down' apart from 'no notices'.
+    """
+    # Both pages are fetched at the same time
+    home, archive = await asyncio.gather(
+        fetch_notice_source(HOME_URL, parse_home_notices),
+        fetch_notice_source(ARCHIVE_URL, parse_archive_notices),
+    )
+    if home is None and archive is None: return None
+
+    notices = []
+    seen_urls = set()
+    for notice_obj in (home or []) + (archive or []):
+        if notice_obj["url"] in seen_urls: continue
+        notices.append(notice_obj)
+        seen_urls.add(notice_obj["url"])
+    return notices
+
+async def get_live_notices(keyword=None):
+    """
+    Combines notices from Homepage & Archive.
+    Ignores 'javascript:' links AND General Menu Links.
+    """
+    print(f"🕵️‍♂️ Scraping Notices (Keyword: {keyword})...")
+
+    notices = await fetch_all_notices() or []
+    # Keyword Check (Strict): sirf tab add karo agar keyword title mein ho
+    if keyword: notices = [n for n in notices if keyword.lower() in n["title"].lower()]
 
     print(f"✅ Total Found: {len(notices)} notices.")
     return notices[:5]
 
-def extract_text_from_pdf(pdf_url):
+def read_pdf_bytes(pdf_bytes):
+    """
+    pypdf first, OCR fallback for scanned notices. Blocking, run it in a thread.
+    Returns (text, used_ocr, ok) - `ok` is False when OCR crashed, so the result isn't worth caching.
+    """
+    f = io.BytesIO(pdf_bytes)
+    
+    text = ""
+    page_count = OCR_MAX_PAGES
+    
+    # 3. PyPDF Extraction
+    try:
+        with span("pdf_parse"):
+            reader = PdfReader(f)
+            page_count = len(reader.pages)
+            for i in range(min(PDF_MAX_PAGES, page_count)):
+                extracted = reader.pages[i].extract_text()
+                if extracted: text += extracted + "\n"
+                if len(text) >= PDF_TEXT_LIMIT: break
+    except: pass
+
+    # 4. OCR Extraction (Fallback) - pages run in parallel across cores
+    if len(text.strip()) < 50:
+        print(f"⚠️ Switching to OCR Mode ({min(page_count, OCR_MAX_PAGES)} pages)...")
+        try:
+            with span("ocr"):
+                ocr_text = ocr_pdf(pdf_bytes, page_count, char_limit=PDF_TEXT_LIMIT)
+            
+            if ocr_text.strip(): text = f"[OCR SUCCESS]\n{ocr_text}"
+            else: text = "[OCR FAILED]"
+            return text[:PDF_TEXT_LIMIT], True, True
+        except Exception as e:
+            print(f"❌ OCR Error: {e}")
+            return "[SCANNED DOCUMENT: Unable to read image text.]", True, False
+    
+    return text[:PDF_TEXT_LIMIT], False, True
+
+async def extract_text_from_pdf(pdf_url):
     print(f"📄 Downloading PDF: {pdf_url}")
     
     # 1. Bad Link Check
     if "javascript" in pdf_url.lower() or "underconstruction" in pdf_url.lower():
         return "[ERROR: The link is broken or under construction on the RGPV website.]"
 
+    # 2. Cache Check (same exam/result notices get asked about all day)
+    cached = pdf_cache.get(pdf_url)
+    if cached and pdf_cache.is_fresh(cached):
+        print("⚡ PDF cache hit")
+        PDF_CACHE_RESULTS.inc(result="fresh")
+        return cached["text"]
+
     try:
-        # 2. Header Check (Kya ye sach mein PDF hai?)
-        response = requests.get(pdf_url, headers=HEADERS, verify=False, timeout=15)
+        # 3. Header Check (Kya ye sach mein PDF hai?) + conditional GET if we already have a copy
+        headers = pdf_cache.conditional_headers(cached) if cached else None
+        with span("pdf_download"):
+            response = await scraper.get(pdf_url, headers=headers)
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+        if cached and response.status_code == 304:
+            print("⚡ PDF not modified, using cached text")
+            PDF_CACHE_RESULTS.inc(result="not_modified")
+            return pdf_cache.touch(pdf_url, cached, **validators)["text"]
+
         content_type = response.headers.get("Content-Type", "").lower()
         
         if "text/html" in content_type:
             return "[ALERT: This is a webpage, not a PDF. Please view the link directly.]"
 
-        pdf_bytes = response.content
-        f = io.BytesIO(pdf_bytes)
-        
-        text = ""
-        
-        # 3. PyPDF Extraction
-        try:
-            reader = PdfReader(f)
-            max_pages = min(3, len(reader.pages))
-            for i in range(max_pages):
-                extracted = reader.pages[i].extract_text()
-                if extracted: text += extracted + "\n"
-        except: pass
-
-        # 4. OCR Extraction (Fallback)
-        if len(text.strip()) < 50:
-            print("⚠️ Switching to OCR Mode...")
-            try:
-                # Poppler Path Optional (Agar Environment Variable set hai)
-                images = convert_from_bytes(pdf_bytes, first_page=1, last_page=2, poppler_path=None)
-                ocr_text = ""
-                for img in images:
-                    ocr_text += pytesseract.image_to_string(img) + "\n"
-                
-                if ocr_text.strip(): text = f"[OCR SUCCESS]\n{ocr_text}"
-                else: text = "[OCR FAILED]"
-            except Exception as e:
-                print(f"❌ OCR Error: {e}")
-                text = "[SCANNED DOCUMENT: Unable to read image text.]"
-        
-        return text[:4000]
+        # Server ignored the validators but sent the same bytes -> still no need to re-extract
+        digest = content_hash(response.content)
+        if cached and cached.get("content_hash") == digest:
+            PDF_CACHE_RESULTS.inc(result="same_content")
+            return pdf_cache.touch(pdf_url, cached, **validators)["text"]
+
+        PDF_CACHE_RESULTS.inc(result="miss")
+        text, used_ocr, ok = await asyncio.to_thread(read_pdf_bytes, response.content)
+        if ok:
+            pdf_cache.put(pdf_url, content_hash=digest, text=text, ocr=used_ocr, **validators)
+        return text
 
     except Exception as e:
         print(f"⚠️ PDF Error: {e}")
+        # Site down? An old copy is better than nothing
+        if cached:
+            PDF_CACHE_RESULTS.inc(result="stale")
+            return cached["text"]
         return "Could not download PDF."
 
 # ==========================================
@@ -0,0 +1,83 @@
+# backend/session_store.py
+# Per-kiosk / per-session conversation memory (replaces the single global CHAT_HISTORY list).
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict, deque
+
+from context_packer import count_tokens
+
+MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "6"))         # ring buffer size per session
+MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "500"))  # global cap, least recently used dropped first
+IDLE_TIMEOUT = int(os.getenv("SESSION_IDLE_TIMEOUT", "300"))  # seconds; kiosk users walk away
+MAX_TURN_CHARS = 1000  # a single huge reply shouldn't eat the whole budget
+
+# Words that only make sense with the previous turn: "and its fees?", "what about the girls hostel?"
+FOLLOW_UP = re.compile(
+    r"^\s*(and|also|what about|how about|then|so)\b"
+    r"|\b(it|its|it's|that|this|those|these|they|them|their|there|he|she|his|her|him|same|more|above|previous|earlier)\b",
+    re.I,
+)
+
+
+def is_follow_up(text):
+    """True when `text` likely leans on the conversation so far (very short questions count too)."""
+    return len(re.findall(r"[a-z0-9']+", text.lower())) <= 2 or bool(FOLLOW_UP.search(text))
+
+
+class SessionStore:
+    def __init__(self, max_turns=MAX_TURNS, max_sessions=MAX_SESSIONS, idle_timeout=IDLE_TIMEOUT):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()  # session id -> (last_seen, deque of turns), oldest first
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        while self._sessions:
+            sid, (last_seen, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_seen <= self.idle_timeout: break
+            del self._sessions[sid]
+
+    def add_turn(self, session_id, user_text, reply):
+        if not session_id: return
+        now = time.time()
+        with self._lock:
+            _, turns = self._sessions.pop(session_id, (now, None))
+            if turns is None: turns = deque(maxlen=self.max_turns)
+            turns.append({"user": user_text[:MAX_TURN_CHARS], "ai": reply[:MAX_TURN_CHARS]})
+            self._sessions[session_id] = (now, turns)
+            self._evict(now)
+
+    def history(self, session_id):
+        if not session_id: return []
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(session_id)
+            return list(entry[1]) if entry else []
+
+    def recent_text(self, session_id, token_budget):
+        """Newest turns that fit in `token_budget`, formatted oldest -> newest for the prompt."""
+        lines = []
+        used = 0
+        for turn in reversed(self.history(session_id)):
+            line = f"User: {turn['user']}\nAssistant: {turn['ai']}"
+            cost = count_tokens(line)
+            if used + cost > token_budget: break
+            lines.insert(0, line)
+            used += cost
+        return "\n".join(lines)
+
+    def prompt_history(self, session_id, text, token_budget):
+        """
+        History that goes into the prompt for `text`: only follow-ups get it. Stand-alone questions are
+        answered the same in every conversation, which keeps them cacheable on a long-lived kiosk session.
+        """
+        return self.recent_text(session_id, token_budget) if is_follow_up(text) else ""
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,180 @@
+# backend/structured_index.py
+# Inverted index + typo-tolerant lookup for the small structured datasets (bus routes, hostels).
+# Records can come from a JSON/CSV file (reloaded when it changes) or fall back to the Python literals.
+
+import os
+import re
+import csv
+import json
+import math
+import threading
+
+MAX_EDITS = 2
+EXACT_BONUS = 1.0
+FUZZY_PENALTY = 0.7  # a typo match counts a bit less than an exact one
+MIN_SCORE_RATIO = 0.5  # drop hits scoring under half of the best one (e.g. a shared 'nagar')
+
+
+def tokenize(text):
+    return re.findall(r'[a-z0-9]+', str(text).lower())
+
+
+def allowed_edits(token):
+    if token.isdigit() or len(token) < 4: return 0  # route numbers / 'mp', 'tt' must match exactly
+    return 1 if len(token) < 7 else MAX_EDITS
+
+
+def deletes(word, depth):
+    """Every string reachable from `word` by deleting up to `depth` characters (SymSpell candidates)."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, bailing out early once it is over `limit`."""
+    if abs(len(a) - len(b)) > limit: return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit: return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """
+    postings: token -> {doc_id: field weight}. Scores are weight * idf, summed over query tokens.
+    A doc only counts as a hit if it matched a distinctive token (one that isn't in most docs),
+    so 'hostel' alone doesn't return every hostel.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.delete_map = {}
+        self.doc_count = 0
+
+    def add(self, doc_id, text, weight=1.0):
+        self.doc_count = max(self.doc_count, doc_id + 1)
+        for token in tokenize(text):
+            docs = self.postings.setdefault(token, {})
+            docs[doc_id] = max(docs.get(doc_id, 0), weight)
+
+    def build(self):
+        self.delete_map = {}
+        for token in self.postings:
+            for variant in deletes(token, allowed_edits(token)):
+                self.delete_map.setdefault(variant, set()).add(token)
+
+    def idf(self, token):
+        return math.log(1 + self.doc_count / len(self.postings[token]))
+
+    def distinctive(self, token):
+        return self.doc_count < 4 or len(self.postings[token]) <= self.doc_count / 2
+
+    def expand(self, token):
+        """[(vocab token, match quality)] for a query token: exact hit, else typo-tolerant candidates."""
+        if token in self.postings: return [(token, EXACT_BONUS)]
+        limit = allowed_edits(token)
+        if not limit: return []
+        candidates = set()
+        for variant in deletes(token, limit):
+            candidates |= self.delete_map.get(variant, set())
+        return [(c, FUZZY_PENALTY) for c in candidates if edit_distance(token, c, limit) <= limit]
+
+    def search(self, query, limit=None):
+        scores = {}
+        qualified = set()
+        for token in set(tokenize(query)):
+            for vocab_token, quality in self.expand(token):
+                idf = self.idf(vocab_token)
+                for doc_id, weight in self.postings[vocab_token].items():
+                    scores[doc_id] = scores.get(doc_id, 0) + weight * idf * quality
+                    if self.distinctive(vocab_token): qualified.add(doc_id)
+        ranked = sorted(qualified, key=lambda d: (-scores[d], d))
+        if ranked: ranked = [d for d in ranked if scores[d] >= scores[ranked[0]] * MIN_SCORE_RATIO]
+        return [(d, scores[d]) for d in ranked[:limit]]
+
+
+# ==========================================
+# FILE-BACKED DATASETS
+# ==========================================
+
+def load_records(path, list_fields=()):
+    """JSON (list of objects) or CSV. In CSV, list fields are separated by ';' or '|'."""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        records = []
+        for row in csv.DictReader(f):
+            row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            for field in list_fields:
+                row[field] = [x.strip() for x in re.split(r'[;|]', row.get(field, "")) if x.strip()]
+            records.append(row)
+        return records
+
+
+class DatasetIndex:
+    """
+    Keeps records + their FuzzyIndex in sync with the first existing file in `paths`
+    (checked by mtime on every lookup, so staff can publish new routes without a deploy).
+    `fields` maps record field -> weight; list fields are indexed item by item.
+    """
+
+    def __init__(self, default_records, paths, fields, list_fields=()):
+        self.default_records = default_records
+        self.paths = paths
+        self.fields = fields
+        self.list_fields = list_fields
+        self._lock = threading.Lock()
+        self._signature = object()
+        self.records = []
+        self.index = FuzzyIndex()
+
+    def _current_source(self):
+        for path in self.paths:
+            try:
+                return path, os.stat(path).st_mtime
+            except OSError: continue
+        return None, None
+
+    def refresh(self):
+        path, mtime = self._current_source()
+        if (path, mtime) == self._signature: return
+        with self._lock:
+            if (path, mtime) == self._signature: return
+            records = self.default_records
+            if path:
+                try:
+                    records = load_records(path, self.list_fields)
+                    print(f"📂 Loaded {len(records)} records from {os.path.basename(path)}")
+                except Exception as e:
+                    print(f"⚠️ Could not load {path}, using built-in data: {e}")
+            index = FuzzyIndex()
+            for doc_id, record in enumerate(records):
+                for field, weight in self.fields.items():
+                    value = record.get(field, "")
+                    for item in (value if isinstance(value, list) else [value]):
+                        index.add(doc_id, item, weight)
+            index.build()
+            self.records, self.index, self._signature = records, index, (path, mtime)
+
+    def version(self):
+        """Changes whenever the backing file does (used to invalidate cached answers)."""
+        self.refresh()
+        return self._signature
+
+    def search(self, query, limit=None):
+        self.refresh()
+        records, index = self.records, self.index
+        return [records[doc_id] for doc_id, _ in index.search(query, limit)]
+
+    def all(self):
+        self.refresh()
+        return self.records
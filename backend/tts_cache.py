@@ -0,0 +1,67 @@
+# backend/tts_cache.py
+# Content-addressed cache for TTS audio + Rhubarb lip-sync, so repeated replies skip edge-tts/ffmpeg/rhubarb.
+
+import os
+import hashlib
+import threading
+
+# Bump this whenever the voice settings or ffmpeg/rhubarb arguments change, so old clips stop matching
+PIPELINE_VERSION = "1"
+
+
+class TTSCache:
+    """
+    One (mp3, json) pair per hash of (text, voice, pipeline version).
+    File mtime doubles as the LRU clock: hits touch the files, eviction drops the oldest first.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, text, voice):
+        raw = f"{PIPELINE_VERSION}\n{voice}\n{text.strip()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def paths(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3"), os.path.join(self.cache_dir, f"{key}.json")
+
+    def lookup(self, key):
+        """True if both files for `key` exist (and marks them as recently used)."""
+        mp3_path, json_path = self.paths(key)
+        if not (os.path.exists(mp3_path) and os.path.exists(json_path)): return False
+        try:
+            os.utime(mp3_path)
+            os.utime(json_path)
+        except OSError: pass
+        return True
+
+    def store(self, key, mp3_src, json_src):
+        """Moves freshly generated files into the cache. The json goes last, so a half-stored entry never looks like a hit."""
+        mp3_path, json_path = self.paths(key)
+        os.replace(mp3_src, mp3_path)
+        os.replace(json_src, json_path)
+        self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = {}
+            for filename in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, filename)
+                try: st = os.stat(path)
+                except OSError: continue
+                key = os.path.splitext(filename)[0]
+                size, mtime = entries.get(key, (0, 0))
+                entries[key] = (size + st.st_size, max(mtime, st.st_mtime))
+
+            total = sum(size for size, _ in entries.values())
+            if total <= self.max_bytes: return
+
+            for key, (size, _) in sorted(entries.items(), key=lambda e: e[1][1]):
+                for path in self.paths(key):
+                    try: os.remove(path)
+                    except OSError: pass
+                total -= size
+                if total <= self.max_bytes: break
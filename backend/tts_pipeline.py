@@ -0,0 +1,126 @@
+# backend/tts_pipeline.py
+# edge-tts -> ffmpeg -> rhubarb, without blocking the event loop.
+# ffmpeg/rhubarb run as plain subprocesses on a small dedicated thread pool (asyncio subprocesses
+# aren't available on Windows when uvicorn runs with --reload, which is how run_kiosk.bat starts us).
+
+import os
+import re
+import asyncio
+import subprocess
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import edge_tts
+
+from metrics import span
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGE_TIMEOUT = int(os.getenv("TTS_STAGE_TIMEOUT", "60"))  # seconds per ffmpeg/rhubarb run
+# Explicit executables (e.g. a system-wide ffmpeg, or the benchmark stand-ins); default: search as before
+FFMPEG_PATH = os.getenv("FFMPEG_PATH")
+RHUBARB_PATH = os.getenv("RHUBARB_PATH")
+
+
+def get_executable_path(filename, subfolder=None):
+    if subfolder:
+        local_path = os.path.join(BASE_DIR, subfolder, filename)
+        if os.path.exists(local_path): return local_path
+    root_path = os.path.join(BASE_DIR, filename)
+    if os.path.exists(root_path): return root_path
+    return filename
+
+
+class TTSBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class TTSWorkerPool:
+    """
+    At most `max_workers` ffmpeg/rhubarb processes at once, and at most `max_queue` jobs waiting.
+    Anything beyond that is rejected straight away instead of piling up processes.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self.pending = 0  # only touched from the event loop thread
+
+    def full(self):
+        return self.pending >= self.max_pending
+
+    @contextmanager
+    def slot(self):
+        if self.full(): raise TTSBusy()
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    def submit(self, fn, *args):
+        # The concurrent future (not an asyncio wrapper) tells when the thread is really done
+        return self.executor.submit(fn, *args)
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+# ==========================================
+# STAGES
+# ==========================================
+
+def split_sentences(text, min_chars=40):
+    """Splits a reply into speakable segments; tiny sentences get merged so we don't spawn a clip per 'Yes.'"""
+    parts = [p.strip() for p in re.split(r'(?<=[.!?])\s+', text) if p.strip()]
+    segments = []
+    for part in parts:
+        if segments and len(segments[-1]) < min_chars: segments[-1] += " " + part
+        else: segments.append(part)
+    return segments
+
+
+async def synthesize(text, voice, mp3_path):
+    communicate = edge_tts.Communicate(text, voice)
+    await communicate.save(mp3_path)
+
+
+def transcode(mp3_path, wav_path):
+    ffmpeg_cmd = FFMPEG_PATH or get_executable_path("ffmpeg.exe")
+    subprocess.run([ffmpeg_cmd, "-y", "-i", mp3_path, "-ac", "1", "-ar", "16000", wav_path],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=STAGE_TIMEOUT)
+
+
+def lipsync(wav_path, json_path):
+    rhubarb_cmd = RHUBARB_PATH or get_executable_path("rhubarb.exe", "rhubarb")
+    subprocess.run([rhubarb_cmd, "-f", "json", "-o", json_path, wav_path], capture_output=True, timeout=STAGE_TIMEOUT)
+
+
+def remove_files(paths):
+    for path in paths:
+        try: os.remove(path)
+        except OSError: pass
+
+
+async def render_clip(pool, text, voice, mp3_path, json_path):
+    """Runs the full pipeline for one clip. Returns True if both mp3 and lip-sync json were produced."""
+    wav_path = os.path.splitext(mp3_path)[0] + ".wav"
+    job = None
+    try:
+        with span("tts_synthesize"):
+            await synthesize(text, voice, mp3_path)
+        with span("tts_ffmpeg"):
+            job = pool.submit(transcode, mp3_path, wav_path)
+            await asyncio.wrap_future(job)
+        with span("tts_rhubarb"):
+            job = pool.submit(lipsync, wav_path, json_path)
+            await asyncio.wrap_future(job)
+    except BaseException:
+        # Cancelled (client went away) or failed. A stage already running in a thread can't be stopped,
+        # so its files are only removed once it has finished with them; later stages never start.
+        leftovers = (mp3_path, wav_path, json_path)
+        if job is not None and not job.done(): job.add_done_callback(lambda _: remove_files(leftovers))
+        else: remove_files(leftovers)
+        raise
+    remove_files([wav_path])
+    return os.path.exists(mp3_path) and os.path.exists(json_path)
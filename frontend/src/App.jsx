@@ -6,6 +6,16 @@ import "./App.css";
 import CampusMap from "./Map";
 import { LOCATIONS } from "./locations";
 
+// One conversation id per browser tab, so each kiosk keeps its own chat memory on the backend
+const getSessionId = () => {
+  let id = sessionStorage.getItem("kioskSessionId");
+  if (!id) {
+    id = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    sessionStorage.setItem("kioskSessionId", id);
+  }
+  return id;
+};
+
 function App() {
   const recognitionRef = useRef(null);
   const audioRef = useRef(null);
@@ -15,6 +25,7 @@ function App() {
   const [loading, setLoading] = useState(false);
   const [userText, setUserText] = useState(""); 
   const [jsonUrl, setJsonUrl] = useState(null);
+  const [lipSync, setLipSync] = useState(null);
   const [caption, setCaption] = useState(""); 
   const [displayedText, setDisplayedText] = useState(""); 
   
@@ -68,6 +79,14 @@ function App() {
       });
 
       const data = await res.json();
+
+      // Server busy / TTS failed -> at least show the reply as text
+      if (!res.ok || data.error) {
+        isSpeakingRef.current = false;
+        setCaption(text);
+        return;
+      }
+
       if (!audioRef.current) audioRef.current = new Audio();
 
       setJsonUrl(data.json_url);
@@ -100,6 +119,90 @@ function App() {
     }
   };
 
+  // 👇 STREAMING TTS: plays each sentence as soon as the backend has rendered it
+  const playTTSStream = async (text, actionUrl = null, mapTarget = null) => {
+    if (!text) return;
+    isSpeakingRef.current = true;
+
+    const queue = [];
+    let playing = false;
+    let streamDone = false;
+
+    const finish = () => {
+      isSpeakingRef.current = false;
+
+      if (mapTarget && LOCATIONS[mapTarget]) {
+          setActiveLocation(LOCATIONS[mapTarget]);
+      }
+
+      if (actionUrl) {
+          setTimeout(() => window.open(actionUrl, "_blank"), 1000); 
+      }
+    };
+
+    // Segments play back-to-back on the same audio element; cues are relative to each segment
+    const playNext = () => {
+      const segment = queue.shift();
+      if (!segment) {
+        playing = false;
+        if (streamDone) finish();
+        return;
+      }
+      playing = true;
+      setLipSync({ mouthCues: segment.mouthCues || [] });
+      audioRef.current.src = segment.audio_url;
+      audioRef.current.onended = playNext;
+      audioRef.current.oncanplaythrough = () => {
+          audioRef.current.play().catch(e => console.log("Autoplay blocked"));
+      };
+      audioRef.current.load();
+    };
+
+    try {
+      const res = await fetch("http://localhost:8000/tts-stream", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ text }),
+      });
+
+      // Busy or no streaming support -> fall back to the one-shot endpoint
+      if (!res.ok || !res.body) {
+        playTTS(text, actionUrl, mapTarget);
+        return;
+      }
+
+      if (!audioRef.current) audioRef.current = new Audio();
+      setCaption(text);
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const segment = JSON.parse(line);
+          if (segment.audio_url) {
+            queue.push(segment);
+            if (!playing) playNext();
+          }
+        }
+      }
+
+      streamDone = true;
+      if (!playing) finish();
+
+    } catch (err) {
+      isSpeakingRef.current = false;
+      console.error("TTS stream error:", err);
+    }
+  };
+
   const sendToBackend = async (text) => {
     if (!text || !text.trim()) return; 
     setUserText(text); 
@@ -109,14 +212,14 @@ function App() {
       const res = await fetch("http://localhost:8000/chat", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ text }),
+        body: JSON.stringify({ text, session_id: getSessionId() }),
       });
       const data = await res.json();
 
       setLoading(false);
 
       if (data.reply) {
-          playTTS(data.reply, data.action_url, data.map_target);
+          playTTSStream(data.reply, data.action_url, data.map_target);
       } 
 
     } catch (error) {
@@ -164,7 +267,7 @@ function App() {
       <Canvas camera={{ position: [0, 1.2, 1.8], fov: 30 }}>
         <ambientLight intensity={0.9} />
         <directionalLight position={[2, 4, 2]} intensity={1.2} />
-        <Avatar audioRef={audioRef} jsonUrl={jsonUrl} />
+        <Avatar audioRef={audioRef} jsonUrl={jsonUrl} lipSync={lipSync} />
         <OrbitControls enableZoom={false} enablePan={false} target={[0, 0.9, 0]} />
       </Canvas>
 
@@ -28,7 +28,7 @@ const jawTargetMapping = {
   X: 0.0,   // Closed
 };
 
-export default function Avatar({ audioRef, jsonUrl }) {
+export default function Avatar({ audioRef, jsonUrl, lipSync }) {
   const group = useRef();
   const { scene } = useGLTF("/models/avatar.glb");
 
@@ -75,6 +75,11 @@ export default function Avatar({ audioRef, jsonUrl }) {
       .catch(err => console.error("❌ LipSync Error:", err));
   }, [jsonUrl]);
 
+  // Streaming mode: cues arrive inline with each audio segment, no extra fetch needed
+  useEffect(() => {
+    if (lipSync) setLipSyncData(lipSync);
+  }, [lipSync]);
+
   useFrame((state, delta) => {
     if (!faceMeshRef.current || !lipSyncData || !audioRef.current) return;
 